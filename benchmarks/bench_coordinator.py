@@ -0,0 +1,140 @@
+"""Benchmark N coordinators polling N simulated thermostats.
+
+Reports poll latency percentiles, requests per second, event loop lag,
+sockets opened and memory per device:
+
+    python -m benchmarks.bench_coordinator --devices 30 --rounds 20
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.airobot_thermostat.api import async_get_client
+from custom_components.airobot_thermostat.const import HUB_MAX_CONCURRENT_POLLS
+from custom_components.airobot_thermostat.coordinator import AirobotDataUpdateCoordinator
+
+from .simulator import DeviceFarm
+
+LAG_PROBE_INTERVAL = 0.01
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def _async_probe_loop_lag(samples):
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_PROBE_INTERVAL
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(loop.time() - expected)
+
+async def _async_timed_refresh(coordinator, semaphore, latencies):
+    async with semaphore:
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        latencies.append(time.perf_counter() - start)
+
+async def async_run(args):
+    farm = DeviceFarm(
+        args.devices,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+    )
+    await farm.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        # Hub mode keeps the coordinators from scheduling their own polls, the benchmark drives them
+        coordinators = [
+            AirobotDataUpdateCoordinator(
+                hass,
+                async_get_client(hass, device.host, device.username),
+                f"Room {index}",
+                device.host,
+                device.username,
+                device.password,
+                args.poll_timeout,
+                True,
+            )
+            for index, device in enumerate(farm.devices)
+        ]
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+        lag_samples = []
+        lag_probe = asyncio.create_task(_async_probe_loop_lag(lag_samples))
+
+        memory_per_device = None
+        started = time.perf_counter()
+        for round_number in range(args.rounds):
+            round_started = time.perf_counter()
+            await asyncio.gather(
+                *(_async_timed_refresh(coordinator, semaphore, latencies) for coordinator in coordinators)
+            )
+            if round_number == 0:
+                memory_per_device = (tracemalloc.get_traced_memory()[0] - memory_before) / args.devices
+            remaining = args.interval - (time.perf_counter() - round_started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        elapsed = time.perf_counter() - started
+
+        lag_probe.cancel()
+        tracemalloc.stop()
+        failed = sum(1 for coordinator in coordinators if not coordinator.last_update_success)
+        await hass.async_stop(force=True)
+
+    await farm.async_stop()
+
+    print(f"devices:             {args.devices}")
+    print(f"rounds:              {args.rounds}")
+    print(f"polls:               {len(latencies)}")
+    print(f"poll latency p50:    {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"poll latency p90:    {percentile(latencies, 90) * 1000:.1f} ms")
+    print(f"poll latency p99:    {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"poll latency max:    {max(latencies, default=0) * 1000:.1f} ms")
+    print(f"requests/second:     {farm.requests / elapsed:.1f}")
+    print(f"requests total:      {farm.requests}")
+    print(f"simulated errors:    {farm.errors}")
+    print(f"failed at end:       {failed}")
+    print(f"loop lag mean:       {statistics.fmean(lag_samples) * 1000 if lag_samples else 0:.2f} ms")
+    print(f"loop lag p99:        {percentile(lag_samples, 99) * 1000:.2f} ms")
+    print(f"sockets opened:      {farm.sockets_opened}")
+    print(f"memory per device:   {memory_per_device / 1024:.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.0, help="minimum seconds between poll rounds")
+    parser.add_argument("--concurrency", type=int, default=HUB_MAX_CONCURRENT_POLLS, help="coordinators polled at the same time")
+    parser.add_argument("--poll-timeout", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--debug", action="store_true", help="enable debug logging")
+    args = parser.parse_args()
+
+    # Failed polls are counted in the report, only log them when debugging
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.CRITICAL)
+    asyncio.run(async_run(args))
+
+if __name__ == "__main__":
+    main()
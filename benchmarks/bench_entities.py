@@ -0,0 +1,115 @@
+"""Benchmark the CPU cost of updating the entities of N thermostats.
+
+Publishes a new snapshot to every coordinator each round and derives the
+state of all climate and sensor entities the way a state write does,
+without any network traffic:
+
+    python -m benchmarks.bench_entities --devices 30 --rounds 200
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.airobot_thermostat.climate import AirobotThermostat
+from custom_components.airobot_thermostat.coordinator import AirobotDataUpdateCoordinator
+from custom_components.airobot_thermostat.models import FIELDS, parse_payloads
+from custom_components.airobot_thermostat.sensor import AirobotHeatingStatusSensor, AirobotSensor
+
+from .bench_coordinator import percentile
+
+def _payloads(index, round_number):
+    """Return status and settings payloads that change a little every round."""
+    status = {
+        "DEVICE_ID": f"T{index:05d}",
+        "TEMP_AIR": 210 + (index + round_number) % 20,
+        "TEMP_FLOOR": 0,
+        "HUM_AIR": 400 + round_number % 50,
+        "CO2": 600 + round_number % 100,
+        "AQI": 1,
+        "SETPOINT_TEMP": 220,
+        "STATUS_FLAGS": [{"HEATING_ON": round_number % 2}],
+    }
+    settings = {
+        "DEVICE_ID": f"T{index:05d}",
+        "MODE": 1,
+        "SETPOINT_TEMP": 220,
+        "SETPOINT_TEMP_AWAY": 180,
+    }
+    return status, settings
+
+def _build_entities(hass, coordinator, index):
+    entities = [AirobotThermostat(coordinator), AirobotHeatingStatusSensor(coordinator)]
+    entities.extend(AirobotSensor(coordinator, field) for field in FIELDS if field.sensor is not None)
+    for number, entity in enumerate(entities):
+        entity.hass = hass
+        entity.entity_id = f"{entity.__module__.rsplit('.', 1)[-1]}.airobot_{index}_{number}"
+    return entities
+
+async def async_run(args):
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+
+        # Hub mode keeps the coordinators from scheduling polls, the benchmark publishes the snapshots
+        coordinators = [
+            AirobotDataUpdateCoordinator(
+                hass, None, f"Room {index}", f"127.0.0.1:{18100 + index}", f"T{index:05d}", f"pw{index}", hub_mode=True
+            )
+            for index in range(args.devices)
+        ]
+        for index, coordinator in enumerate(coordinators):
+            coordinator.data = coordinator._publish(parse_payloads(*_payloads(index, 0)))
+
+        entities = [
+            entity
+            for index, coordinator in enumerate(coordinators)
+            for entity in _build_entities(hass, coordinator, index)
+        ]
+        for entity in entities:
+            entity._update_from_coordinator()
+
+        refresh_times = []
+        writes = 0
+        for round_number in range(1, args.rounds + 1):
+            started = time.process_time()
+            for index, coordinator in enumerate(coordinators):
+                coordinator.data = coordinator._publish(parse_payloads(*_payloads(index, round_number)))
+            for entity in entities:
+                entity._update_from_coordinator()
+                # The same properties a state write reads, repeated as often as HA may read them
+                for _ in range(args.reads):
+                    entity._async_calculate_state()
+                    entity.device_info
+                    entity.unique_id
+                writes += 1
+            refresh_times.append(time.process_time() - started)
+
+        await hass.async_stop(force=True)
+
+    per_entity = [refresh / len(entities) for refresh in refresh_times]
+    print(f"devices:             {args.devices}")
+    print(f"entities:            {len(entities)}")
+    print(f"rounds:              {args.rounds}")
+    print(f"state writes:        {writes}")
+    print(f"refresh cpu mean:    {statistics.fmean(refresh_times) * 1000:.3f} ms")
+    print(f"refresh cpu p99:     {percentile(refresh_times, 99) * 1000:.3f} ms")
+    print(f"entity cpu mean:     {statistics.fmean(per_entity) * 1000000:.2f} us")
+    print(f"entity cpu p99:      {percentile(per_entity, 99) * 1000000:.2f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=1, help="state calculations per entity and round")
+    parser.add_argument("--debug", action="store_true", help="enable debug logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.CRITICAL)
+    asyncio.run(async_run(args))
+
+if __name__ == "__main__":
+    main()
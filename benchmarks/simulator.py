@@ -0,0 +1,174 @@
+"""Simulated Airobot thermostats for benchmarking without hardware.
+
+Every simulated device listens on its own port on 127.0.0.1 and serves the
+getStatuses, getSettings and setSettings endpoints with Basic authentication.
+Latency, jitter, error rate and hung requests can be tuned per farm.
+
+Run it standalone to point a development Home Assistant at it:
+
+    python -m benchmarks.simulator --devices 10 --port 18100
+"""
+import argparse
+import asyncio
+import base64
+import random
+
+from aiohttp import web
+
+from custom_components.airobot_thermostat.const import (
+    API_URL_GET_SETTINGS,
+    API_URL_SET_SETTINGS,
+    API_URL_STATUS,
+)
+
+# Hung requests never answer within any sensible poll deadline
+HANG_SECONDS = 3600
+
+class SimulatedDevice:
+    """State and request handlers of one simulated thermostat."""
+
+    def __init__(self, farm, index, port):
+        self.farm = farm
+        self.port = port
+        self.username = f"T{index:05d}"
+        self.password = f"pw{index}"
+        self._authorization = "Basic " + base64.b64encode(
+            f"{self.username}:{self.password}".encode("utf-8")
+        ).decode("utf-8")
+        self.status = {
+            "DEVICE_ID": self.username,
+            "TEMP_AIR": 210 + index % 20,
+            "TEMP_FLOOR": 0,
+            "HUM_AIR": 400,
+            "CO2": 600,
+            "AQI": 1,
+            "SETPOINT_TEMP": 220,
+            "STATUS_FLAGS": [{"HEATING_ON": 0}],
+        }
+        self.settings = {
+            "DEVICE_ID": self.username,
+            "MODE": 1,
+            "SETPOINT_TEMP": 220,
+            "SETPOINT_TEMP_AWAY": 180,
+        }
+        self.requests = 0
+        self.transports = set()
+
+    @property
+    def host(self):
+        return f"127.0.0.1:{self.port}"
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get(API_URL_STATUS, self._handle_status)
+        app.router.add_get(API_URL_GET_SETTINGS, self._handle_get_settings)
+        app.router.add_post(API_URL_SET_SETTINGS, self._handle_set_settings)
+        app.middlewares.append(self._middleware)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests += 1
+        self.farm.requests += 1
+        # Each distinct transport is one socket opened by the client
+        self.transports.add(id(request.transport))
+
+        farm = self.farm
+        if farm.hang_rate and random.random() < farm.hang_rate:
+            await asyncio.sleep(HANG_SECONDS)
+        delay = farm.latency + random.uniform(-farm.jitter, farm.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if farm.error_rate and random.random() < farm.error_rate:
+            farm.errors += 1
+            return web.Response(status=500, text="Simulated error")
+        if request.headers.get("Authorization") != self._authorization:
+            return web.Response(status=401, text="Unauthorized")
+        return await handler(request)
+
+    async def _handle_status(self, request):
+        # Let the air temperature wander a little, like a real room
+        self.status["TEMP_AIR"] += random.choice((-1, 0, 0, 0, 1))
+        return web.json_response(self.status)
+
+    async def _handle_get_settings(self, request):
+        return web.json_response(self.settings)
+
+    async def _handle_set_settings(self, request):
+        payload = await request.json()
+        for key, value in payload.items():
+            if key in self.settings and key != "DEVICE_ID":
+                self.settings[key] = value
+        if "SETPOINT_TEMP" in payload and self.settings["MODE"] == 1:
+            self.status["SETPOINT_TEMP"] = payload["SETPOINT_TEMP"]
+        return web.json_response({})
+
+class DeviceFarm:
+    """A set of simulated thermostats served from consecutive local ports."""
+
+    def __init__(self, count, base_port=0, latency=0.02, jitter=0.01, error_rate=0.0, hang_rate=0.0):
+        self.count = count
+        self.base_port = base_port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.devices = []
+        self.requests = 0
+        self.errors = 0
+        self._runners = []
+
+    @property
+    def sockets_opened(self):
+        return sum(len(device.transports) for device in self.devices)
+
+    async def async_start(self):
+        for index in range(self.count):
+            port = self.base_port + index if self.base_port else 0
+            device = SimulatedDevice(self, index, port)
+            runner = web.AppRunner(device.app(), access_log=None, shutdown_timeout=0.1)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", port)
+            await site.start()
+            # Pick up the port chosen by the OS when none was given
+            device.port = runner.addresses[0][1]
+            self.devices.append(device)
+            self._runners.append(runner)
+
+    async def async_stop(self):
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+async def _async_main(args):
+    farm = DeviceFarm(
+        args.devices,
+        base_port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+    )
+    await farm.async_start()
+    for device in farm.devices:
+        print(f"{device.host} username={device.username} password={device.password}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await farm.async_stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=5)
+    parser.add_argument("--port", type=int, default=18100, help="port of the first device")
+    parser.add_argument("--latency", type=float, default=0.02, help="response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that never answer")
+    try:
+        asyncio.run(_async_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
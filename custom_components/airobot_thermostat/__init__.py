@@ -1,42 +1,134 @@
+from datetime import timedelta
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_SCAN_INTERVAL
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .api import async_get_client, async_release_client
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_CAPABILITIES,
+    CONF_CO2_DEADBAND,
+    CONF_DUTY_CYCLE_WINDOWS,
+    CONF_HEATER_POWER,
+    CONF_HOME,
+    CONF_HUB_MODE,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_POLL_TIMEOUT,
+    CONF_STREAMING,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_DUTY_CYCLE_WINDOWS,
+    DEFAULT_POLL_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
 from .coordinator import AirobotDataUpdateCoordinator
+from .hub import async_get_hub, async_release_hub
+from .relay import async_get_relay, async_release_relay
+from .services import async_setup_services
+from .store import AirobotStore
+
+# The integration is only set up from config entries
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
-    """Set up the integration from yaml (not used here, since we use config flow)."""
+    """Set up the integration services (yaml is not used here, since we use config flow)."""
+    async_setup_services(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up your integration from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    # Requests to the same host share one pooled client across config entries
+    client = async_get_client(hass, entry.data["host"], entry.entry_id)
+    hub_mode = entry.options.get(CONF_HUB_MODE, False)
+
+    # Ignore jitter below these thresholds when deciding whether a sensor changed
+    temperature_deadband = entry.options.get(CONF_TEMPERATURE_DEADBAND, 0)
+    deadbands = {
+        "temperature": temperature_deadband,
+        "floor_temperature": temperature_deadband,
+        "humidity": entry.options.get(CONF_HUMIDITY_DEADBAND, 0),
+        "co2": entry.options.get(CONF_CO2_DEADBAND, 0),
+    }
+
+    # The last known state, so the entities don't have to wait for the thermostat
+    store = AirobotStore(hass, entry.entry_id)
+    cached_data, cached_analytics = await store.async_load()
+
     # Initialize the DataUpdateCoordinator
     coordinator = AirobotDataUpdateCoordinator(
         hass, 
+        client,
         entry.data["room"], 
         entry.data["host"], 
         entry.data["username"], 
-        entry.data["password"]
+        entry.data["password"],
+        entry.options.get(CONF_POLL_TIMEOUT, DEFAULT_POLL_TIMEOUT),
+        hub_mode,
+        deadbands,
+        store,
+        entry.data.get(CONF_CAPABILITIES, ()),
+        timedelta(seconds=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL.total_seconds())),
+        entry.options.get(CONF_ADAPTIVE_POLLING, False),
+        entry.options.get(CONF_HEATER_POWER, 0),
+        [int(hours) for hours in entry.options.get(CONF_DUTY_CYCLE_WINDOWS, DEFAULT_DUTY_CYCLE_WINDOWS)],
     )
+    if cached_analytics is not None:
+        coordinator.analytics.restore(cached_analytics)
 
     # Store the coordinator so it's accessible in other parts of the integration
     hass.data[DOMAIN][entry.entry_id] = {
-        "coordinator": coordinator
+        "coordinator": coordinator,
+        "options": dict(entry.options),
+        # Thermostats of the same home share their Home/Away preset
+        "home": entry.options.get(CONF_HOME, ""),
     }
 
-    # Fetch the first update to populate initial data
-    await coordinator.async_config_entry_first_refresh()
+    if cached_data is not None:
+        # Start from the cached state, the first poll runs once the entities exist
+        coordinator.async_restore(cached_data)
+    else:
+        # Nothing cached yet, fetch the first update to populate initial data
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            hass.data[DOMAIN].pop(entry.entry_id)
+            async_release_client(hass, entry.data["host"], entry.entry_id)
+            raise
+
+    # In hub mode all thermostats are polled together by the shared hub
+    if hub_mode:
+        async_get_hub(hass).async_add_coordinator(entry.entry_id, coordinator)
+
+    # In streaming mode status changes are also pushed by the shared relay between polls
+    if entry.options.get(CONF_STREAMING, False):
+        async_get_relay(hass).async_add_coordinator(entry.entry_id, coordinator)
+
+    # Reload the entry when its options change
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     # Forward the setup to the platform (climate, sensor, etc.)
     await hass.config_entries.async_forward_entry_setups(entry, ["climate", "sensor"])  # Properly await multiple setups
 
+    # A slow or offline thermostat doesn't hold up the startup of Home Assistant
+    if cached_data is not None:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.data['room']}"
+        )
 
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry after its options were updated."""
+    # Updates of the entry data, like newly found capabilities, don't need a reload
+    if entry.options == hass.data[DOMAIN][entry.entry_id]["options"]:
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload the config entry."""
     unload_ok = await hass.config_entries.async_forward_entry_unload(entry, "climate")
@@ -45,5 +137,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Remove the coordinator and clean up data
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_release_hub(hass, entry.entry_id)
+        async_release_relay(hass, entry.entry_id)
+        async_release_client(hass, entry.data["host"], entry.entry_id)
 
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached state of a deleted config entry."""
+    await AirobotStore(hass, entry.entry_id).async_remove()
@@ -0,0 +1,144 @@
+from array import array
+from .const import ANALYTICS_MAX_GAP, ANALYTICS_MIN_WARMUP, DUTY_CYCLE_BUCKETS
+
+class DutyCycleWindow:
+    """Share of time the heater was on over a rolling window.
+
+    The window is split into fixed time buckets with running totals, so an
+    update only touches the current bucket and the ones that expired.
+    """
+
+    def __init__(self, seconds, buckets=DUTY_CYCLE_BUCKETS):
+        self.seconds = seconds
+        self._bucket_seconds = seconds / buckets
+        self._on = array("d", [0.0]) * buckets
+        self._total = array("d", [0.0]) * buckets
+        self._on_sum = 0.0
+        self._total_sum = 0.0
+        # Number of the current bucket since the epoch
+        self._bucket = None
+
+    def add(self, timestamp, elapsed, heating):
+        """Count `elapsed` seconds ending at `timestamp`, with the heater on or off."""
+        self._advance(int(timestamp // self._bucket_seconds))
+        index = self._bucket % len(self._on)
+        self._total[index] += elapsed
+        self._total_sum += elapsed
+        if heating:
+            self._on[index] += elapsed
+            self._on_sum += elapsed
+
+    def _advance(self, bucket):
+        if self._bucket is None or bucket - self._bucket >= len(self._on):
+            self._clear()
+        elif bucket > self._bucket:
+            # At most one pass over the ring, however long the gap was
+            for expired in range(self._bucket + 1, bucket + 1):
+                index = expired % len(self._on)
+                self._on_sum -= self._on[index]
+                self._total_sum -= self._total[index]
+                self._on[index] = 0.0
+                self._total[index] = 0.0
+        elif bucket < self._bucket:
+            # The clock went backwards, keep counting in the current bucket
+            return
+        self._bucket = bucket
+
+    def _clear(self):
+        for index in range(len(self._on)):
+            self._on[index] = 0.0
+            self._total[index] = 0.0
+        self._on_sum = 0.0
+        self._total_sum = 0.0
+
+    @property
+    def duty_cycle(self):
+        """Return the percentage of the window the heater was on, None before any data."""
+        if self._total_sum <= 0:
+            return None
+        return round(100 * max(0.0, self._on_sum) / self._total_sum, 1)
+
+    def as_dict(self):
+        return {"bucket": self._bucket, "on": list(self._on), "total": list(self._total)}
+
+    def restore(self, state):
+        if len(state["on"]) != len(self._on):
+            return
+        self._bucket = state["bucket"]
+        self._on = array("d", state["on"])
+        self._total = array("d", state["total"])
+        self._on_sum = sum(self._on)
+        self._total_sum = sum(self._total)
+
+class HeatingAnalytics:
+    """Heating runtime, duty cycle, warm-up rate and energy, updated in O(1) per poll.
+
+    Each poll counts the time since the previous poll with the heater state
+    seen on the previous poll. Gaps longer than ANALYTICS_MAX_GAP, like a
+    restart, are not counted.
+    """
+
+    def __init__(self, windows=(), heater_power=0):
+        self.windows = [DutyCycleWindow(seconds) for seconds in windows]
+        self._heater_power = heater_power
+        # Totals since the analytics started, in hours and kWh
+        self.runtime = 0.0
+        self.energy = 0.0
+        self.warmup_rate = None
+        self._last_timestamp = None
+        self._last_heating = False
+        # Start of the current heating cycle, and the air temperature at that time
+        self._cycle_start = None
+        self._cycle_start_temperature = None
+
+    def update(self, timestamp, data):
+        """Add a snapshot taken at `timestamp` (seconds since the epoch)."""
+        heating = bool(data.heating_on)
+        elapsed = None if self._last_timestamp is None else timestamp - self._last_timestamp
+        if elapsed is not None and 0 < elapsed <= ANALYTICS_MAX_GAP:
+            for window in self.windows:
+                window.add(timestamp, elapsed, self._last_heating)
+            if self._last_heating:
+                self.runtime += elapsed / 3600
+                self.energy += self._heater_power * elapsed / 3600000
+        elif elapsed is not None and elapsed > ANALYTICS_MAX_GAP:
+            # The cycle was not followed through the gap
+            self._cycle_start = None
+
+        self._update_warmup(timestamp, heating, data.temperature)
+        self._last_timestamp = timestamp
+        self._last_heating = heating
+
+    def _update_warmup(self, timestamp, heating, temperature):
+        """Track the rise of the air temperature over the current heating cycle, in °C/min."""
+        if not heating or temperature is None:
+            self._cycle_start = None
+            return
+
+        if self._cycle_start is None:
+            self._cycle_start = timestamp
+            self._cycle_start_temperature = temperature
+            return
+
+        # Short cycles give too noisy a rate with tenths of a degree readings
+        duration = timestamp - self._cycle_start
+        if duration >= ANALYTICS_MIN_WARMUP:
+            self.warmup_rate = round((temperature - self._cycle_start_temperature) * 60 / duration, 3)
+
+    def as_dict(self):
+        return {
+            "runtime": self.runtime,
+            "energy": self.energy,
+            "warmup_rate": self.warmup_rate,
+            "windows": {str(window.seconds): window.as_dict() for window in self.windows},
+        }
+
+    def restore(self, state):
+        """Restore the totals and windows saved by as_dict."""
+        self.runtime = state.get("runtime", 0.0)
+        self.energy = state.get("energy", 0.0)
+        self.warmup_rate = state.get("warmup_rate")
+        windows = state.get("windows", {})
+        for window in self.windows:
+            if str(window.seconds) in windows:
+                window.restore(windows[str(window.seconds)])
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from .const import DATA_CLIENTS, MAX_CONNECTIONS_PER_HOST
+
+_LOGGER = logging.getLogger(__name__)
+
+class AirobotClient:
+    """Keep-alive HTTP client for a single thermostat host.
+
+    Requests go through Home Assistant's shared aiohttp session, so connections
+    are pooled and reused between polls instead of being opened for every request.
+    """
+
+    def __init__(self, session, host, limit=MAX_CONNECTIONS_PER_HOST):
+        self._session = session
+        self._host = host
+        self._base_url = f"http://{host}"
+        self._semaphore = asyncio.Semaphore(limit)
+        self.users = set()
+
+    @property
+    def host(self):
+        return self._host
+
+    async def async_request(self, method, path, headers, payload=None):
+        """Send a request and return the status code and the raw response body."""
+        async with self._semaphore:
+            async with self._session.request(
+                method, f"{self._base_url}{path}", json=payload, headers=headers
+            ) as response:
+                # Reading the whole body hands the connection back to the pool
+                return response.status, await response.read()
+
+@callback
+def async_get_client(hass: HomeAssistant, host: str, entry_id: str) -> AirobotClient:
+    """Return the shared client for a host, creating it on first use."""
+    clients = hass.data.setdefault(DATA_CLIENTS, {})
+    client = clients.get(host)
+    if client is None:
+        _LOGGER.debug("Creating HTTP client for %s", host)
+        client = clients[host] = AirobotClient(async_get_clientsession(hass), host)
+    client.users.add(entry_id)
+    return client
+
+@callback
+def async_release_client(hass: HomeAssistant, host: str, entry_id: str) -> None:
+    """Drop a config entry's reference to a client and forget it once unused."""
+    clients = hass.data.get(DATA_CLIENTS, {})
+    client = clients.get(host)
+    if client is None:
+        return
+
+    client.users.discard(entry_id)
+    if not client.users:
+        _LOGGER.debug("Releasing HTTP client for %s", host)
+        clients.pop(host)
@@ -0,0 +1,71 @@
+import random
+import time
+from .const import BREAKER_BASE_BACKOFF, BREAKER_FAILURE_THRESHOLD, BREAKER_MAX_BACKOFF, BREAKER_PROBE_TOLERANCE
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Back off from a thermostat after repeated failures.
+
+    After `threshold` consecutive failures the breaker opens and requests are
+    refused until the backoff has passed. The next request is then let through
+    as a probe: if it succeeds the breaker closes, if it fails the backoff doubles.
+    The probe is let through up to `tolerance` seconds early, so a timer that
+    fires slightly before the backoff ends doesn't miss it.
+    """
+
+    def __init__(self, threshold=BREAKER_FAILURE_THRESHOLD, base_backoff=BREAKER_BASE_BACKOFF, max_backoff=BREAKER_MAX_BACKOFF, tolerance=BREAKER_PROBE_TOLERANCE):
+        self._threshold = threshold
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._tolerance = tolerance
+        self.failures = 0
+        self.backoff = None
+        self._retry_at = None
+
+    @property
+    def state(self):
+        if self._retry_at is None:
+            return STATE_CLOSED
+        if time.monotonic() + self._tolerance < self._retry_at:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    @property
+    def is_open(self):
+        """Return True while requests to the device should not be attempted."""
+        return self.state == STATE_OPEN
+
+    @property
+    def retry_in(self):
+        """Return the number of seconds until the next probe is allowed."""
+        if self._retry_at is None:
+            return 0
+        return max(0, self._retry_at - time.monotonic())
+
+    def record_success(self):
+        self.failures = 0
+        self.backoff = None
+        self._retry_at = None
+
+    def record_failure(self):
+        """Count a failure and return the backoff in seconds when the breaker opened."""
+        self.failures += 1
+        if self.failures < self._threshold:
+            return None
+
+        # Exponential backoff, with jitter so that devices that failed together don't retry together
+        backoff = min(self._max_backoff, self._base_backoff * 2 ** (self.failures - self._threshold))
+        self.backoff = random.uniform(backoff / 2, backoff)
+        self._retry_at = time.monotonic() + self.backoff
+        return self.backoff
+
+    def as_dict(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "backoff": self.backoff,
+            "retry_in": round(self.retry_in, 1),
+        }
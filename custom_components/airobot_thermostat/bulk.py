@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from .const import BULK_MAX_CONCURRENT_WRITES, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_bulk_write(coordinators, target_temp=None, mode=None, max_concurrent=BULK_MAX_CONCURRENT_WRITES):
+    """Write a setpoint and/or mode to many thermostats and refresh them in one batch.
+
+    Every thermostat gets a single setSettings request, at most `max_concurrent`
+    at a time. Returns one result per thermostat, in the order given.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def async_write(coordinator):
+        async with semaphore:
+            try:
+                await coordinator.async_write_settings(target_temp, mode)
+            except UpdateFailed as err:
+                return {"room": coordinator._room, "host": coordinator._host, "success": False, "error": str(err)}
+        return {"room": coordinator._room, "host": coordinator._host, "success": True}
+
+    results = await asyncio.gather(*(async_write(coordinator) for coordinator in coordinators))
+
+    # Read the new settings back from every thermostat that was written to, all at once
+    written = [coordinator for coordinator, result in zip(coordinators, results) if result["success"]]
+    _LOGGER.debug("Wrote settings to %s of %s thermostats, refreshing them", len(written), len(coordinators))
+
+    async def async_refresh(coordinator):
+        async with semaphore:
+            await coordinator.async_refresh()
+
+    await asyncio.gather(*(async_refresh(coordinator) for coordinator in written))
+    return results
+
+@callback
+def async_get_home_coordinators(hass: HomeAssistant, entry_id: str):
+    """Return the coordinators of every loaded thermostat in the same home as a config entry."""
+    loaded = hass.data[DOMAIN]
+    home = loaded[entry_id]["home"]
+    return [data["coordinator"] for data in loaded.values() if data["home"] == home]
@@ -2,22 +2,36 @@ import logging
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import HVACMode, HVACAction, ClimateEntityFeature, PRESET_HOME, PRESET_AWAY
 from homeassistant.const import UnitOfTemperature, ATTR_TEMPERATURE
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.exceptions import HomeAssistantError
+from .bulk import async_bulk_write, async_get_home_coordinators
 from .const import DOMAIN
+from .entity import AirobotEntity
+from .models import MODE_AWAY, PRESET_MODES
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     thermostat = AirobotThermostat(coordinator)
-    async_add_entities([thermostat], update_before_add=True)
+    async_add_entities([thermostat])
 
-class AirobotThermostat(CoordinatorEntity, ClimateEntity):
+class AirobotThermostat(AirobotEntity, ClimateEntity):
+
+    _fields = (
+        "temperature",
+        "floor_temperature",
+        "humidity",
+        "co2",
+        "aqi",
+        "setpoint_temp",
+        "preset_mode",
+        "heating_on",
+    )
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_name = f"Airobot {coordinator._room} Thermostat"
-        self._attr_unique_id = f"{DOMAIN}_{coordinator._username}_{coordinator._room}_climate"
+        self._attr_name = coordinator.context.entity_name("Thermostat")
+        self._attr_unique_id = coordinator.context.unique_id("climate")
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS
         self._attr_hvac_modes = [HVACMode.HEAT]
         self._attr_hvac_mode = HVACMode.HEAT
@@ -28,64 +42,41 @@ class AirobotThermostat(CoordinatorEntity, ClimateEntity):
         self._attr_preset_modes = [PRESET_HOME, PRESET_AWAY]
         self._attr_preset_mode = None
 
-    @property
-    def device_info(self):
-        return self.coordinator.device_info
-
-    @property
-    def preset_mode(self):
-        mode = self.coordinator.data.get("preset_mode", 1)  # Default to Home
-        if mode == 1:
-            return PRESET_HOME
-        elif mode == 2:
-            return PRESET_AWAY
-        return PRESET_HOME  # Default if unknown mode
-
-    @property
-    def current_temperature(self):
-        if self.coordinator.data.get("floor_temperature_available"):
-            return self.coordinator.data["floor_temperature"]
-
-        return self.coordinator.data["temperature"]
-
-    @property
-    def target_temperature(self):
-        return self.coordinator.data["setpoint_temp"]
-
-    @property
-    def hvac_action(self):
-        return HVACAction.HEATING if self.coordinator.data["heating_on"] else HVACAction.IDLE
-
-    @property
-    def extra_state_attributes(self):
-        return {
-            "co2": self.coordinator.data["co2"],
-            "aqi": self.coordinator.data["aqi"],
-            "humidity": self.coordinator.data["humidity"]
+    def _update_from_data(self, data):
+        if data.floor_temperature_available:
+            self._attr_current_temperature = data.floor_temperature
+        else:
+            self._attr_current_temperature = data.temperature
+        self._attr_target_temperature = data.setpoint_temp
+        # Home is the default if the mode is unknown
+        self._attr_preset_mode = PRESET_AWAY if data.preset_mode == MODE_AWAY else PRESET_HOME
+        self._attr_hvac_action = HVACAction.HEATING if data.heating_on else HVACAction.IDLE
+        self._attr_extra_state_attributes = {
+            "co2": data.co2,
+            "aqi": data.aqi,
+            "humidity": data.humidity
         }
-        
+
     async def async_set_temperature(self, **kwargs):
         target_temperature = kwargs.get(ATTR_TEMPERATURE)
         if target_temperature is None:
             _LOGGER.error("No target temperature provided.")
             return
 
-        await self.coordinator._set_temperature(target_temp=target_temperature)
-        self._attr_target_temperature = target_temperature
-
-        # Update the Home Assistant state
-        await self.async_update_ha_state()
+        # The new setpoint is shown right away, the write itself is coalesced
+        # with other changes made in quick succession
+        self.coordinator.async_queue_temperature(target_temperature)
 
     async def async_set_preset_mode(self, preset_mode: str):
         if preset_mode not in self._attr_preset_modes:
             _LOGGER.error("Invalid preset mode: %s", preset_mode)
             return
 
-        # Call the coordinator's method to set the preset mode on the device
-        # await self.coordinator._set_preset_mode(preset_mode)
-
-        # Update the local state
-        # self._attr_preset_mode = preset_mode
+        # Airobot only supports one mode for the whole home, so the change goes to
+        # every thermostat of the home at once and they are refreshed together
+        coordinators = async_get_home_coordinators(self.hass, self.coordinator.config_entry.entry_id)
+        results = await async_bulk_write(coordinators, mode=PRESET_MODES[preset_mode])
 
-        # Request an update to reflect the new preset mode
-        await self.async_update_ha_state()
\ No newline at end of file
+        failed = [result["room"] for result in results if not result["success"]]
+        if failed:
+            raise HomeAssistantError(f"Failed to set the {preset_mode} preset in {', '.join(failed)}")
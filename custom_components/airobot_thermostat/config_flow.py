@@ -2,41 +2,87 @@ import logging
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.const import CONF_HOST, CONF_USERNAME, CONF_PASSWORD, CONF_ROOM
-from .const import DOMAIN
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
+from homeassistant.const import CONF_HOST, CONF_USERNAME, CONF_PASSWORD, CONF_ROOM, CONF_SCAN_INTERVAL
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_CO2_DEADBAND,
+    CONF_DUTY_CYCLE_WINDOWS,
+    CONF_HEATER_POWER,
+    CONF_HOME,
+    CONF_HUB_MODE,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_POLL_TIMEOUT,
+    CONF_STREAMING,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_DUTY_CYCLE_WINDOWS,
+    DEFAULT_POLL_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    DUTY_CYCLE_WINDOW_CHOICES,
+)
+from .discovery import (
+    CannotConnect,
+    InvalidAuth,
+    InvalidNetwork,
+    async_match_credentials,
+    async_scan,
+    async_validate,
+    parse_credentials,
+    parse_hosts,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+CONF_NETWORK = "network"
+CONF_CREDENTIALS = "credentials"
+CONF_DEVICES = "devices"
+
 class AirobotConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for custom thermostat."""
 
     VERSION = 1
     CONNECTION_CLASS = "local_polling"
 
+    def __init__(self):
+        """Initialize the config flow."""
+        self._discovered = {}
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["manual", "discover"])
+
+    async def async_step_manual(self, user_input=None):
+        """Add a single thermostat by its address."""
         errors = {}
 
         if user_input is not None:
             # Try to connect to the device using the provided info
             try:
-                room = user_input[CONF_ROOM]
-                host = user_input[CONF_HOST]
-                username = user_input[CONF_USERNAME]
-                password = user_input[CONF_PASSWORD]
-                
-                # You can add some validation here by making a request to the thermostat
-                # For example, you might want to check if /getStatuses endpoint is reachable.
-
+                await async_validate(
+                    async_get_clientsession(self.hass),
+                    user_input[CONF_HOST],
+                    user_input[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                )
+            except CannotConnect as e:
+                _LOGGER.debug("Error setting up thermostat: %s", e)
+                errors["base"] = "connection_failed"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception as e:
+                _LOGGER.error("Error setting up thermostat: %s", e)
+                errors["base"] = "unknown"
+            else:
                 # If validation passes, we create the entry
+                await self.async_set_unique_id(user_input[CONF_USERNAME])
+                self._abort_if_unique_id_configured(updates={CONF_HOST: user_input[CONF_HOST]})
                 return self.async_create_entry(
-                    title=room,
+                    title=user_input[CONF_ROOM],
                     data=user_input
                 )
-            except Exception as e:
-                _LOGGER.error("Error setting up thermostat: %s", e)
-                errors["base"] = "connection_failed"
 
         # Show the form to the user
         data_schema = vol.Schema({
@@ -47,11 +93,113 @@ class AirobotConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         })
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
+            data_schema=data_schema,
+            errors=errors
+        )
+
+    async def async_step_discover(self, user_input=None):
+        """Scan a network for thermostats and match them with a list of credentials."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                hosts = parse_hosts(user_input[CONF_NETWORK])
+            except InvalidNetwork as e:
+                _LOGGER.debug("Invalid network: %s", e)
+                errors[CONF_NETWORK] = "invalid_network"
+            try:
+                credentials = parse_credentials(user_input[CONF_CREDENTIALS])
+            except ValueError as e:
+                _LOGGER.debug("Invalid credentials: %s", e)
+                errors[CONF_CREDENTIALS] = "invalid_credentials"
+
+            if not errors:
+                errors = await self._async_discover(hosts, credentials)
+                if not errors:
+                    return await self.async_step_discover_confirm()
+
+        data_schema = vol.Schema({
+            vol.Required(CONF_NETWORK, default=(user_input or {}).get(CONF_NETWORK, "")): str,
+            vol.Required(CONF_CREDENTIALS, default=(user_input or {}).get(CONF_CREDENTIALS, "")): TextSelector(
+                TextSelectorConfig(multiline=True)
+            ),
+        })
+
+        return self.async_show_form(
+            step_id="discover",
             data_schema=data_schema,
             errors=errors
         )
 
+    async def _async_discover(self, hosts, credentials):
+        """Find the thermostats that are not set up yet and return the form errors, if any."""
+        configured_hosts = {entry.data.get(CONF_HOST) for entry in self._async_current_entries()}
+        configured_ids = self._async_current_ids()
+        session = async_get_clientsession(self.hass)
+
+        found = await async_scan(session, [host for host in hosts if host not in configured_hosts])
+        _LOGGER.debug("Found %s thermostats: %s", len(found), found)
+        if not found:
+            return {"base": "no_devices_found"}
+
+        credentials = [candidate for candidate in credentials if candidate["username"] not in configured_ids]
+        matches = await async_match_credentials(session, found, credentials)
+        if not matches:
+            return {"base": "no_credentials_matched"}
+
+        self._discovered = {
+            match["username"]: {
+                CONF_HOST: match["host"],
+                CONF_USERNAME: match["username"],
+                CONF_PASSWORD: match["password"],
+                CONF_ROOM: match["room"],
+            }
+            for match in matches
+        }
+        return {}
+
+    async def async_step_discover_confirm(self, user_input=None):
+        """Let the user pick which of the found thermostats to add."""
+        errors = {}
+
+        if user_input is not None:
+            selected = [self._discovered[username] for username in user_input[CONF_DEVICES]]
+            if selected:
+                # Every thermostat but the first gets its own entry through an import flow
+                for device in selected[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=device
+                        )
+                    )
+                return await self.async_step_import(selected[0])
+            errors["base"] = "no_devices_selected"
+
+        devices = {
+            username: f"{device[CONF_ROOM]} ({device[CONF_HOST]})"
+            for username, device in self._discovered.items()
+        }
+        data_schema = vol.Schema({
+            vol.Required(CONF_DEVICES, default=list(devices)): cv.multi_select(devices),
+        })
+
+        return self.async_show_form(
+            step_id="discover_confirm",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={"count": str(len(devices))},
+        )
+
+    async def async_step_import(self, import_data):
+        """Create an entry for a thermostat that was already validated."""
+        await self.async_set_unique_id(import_data[CONF_USERNAME])
+        self._abort_if_unique_id_configured(updates={CONF_HOST: import_data[CONF_HOST]})
+        return self.async_create_entry(
+            title=import_data[CONF_ROOM],
+            data=import_data
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -67,4 +215,58 @@ class AirobotOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
-        return self.async_show_form(step_id="init")
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        data_schema = vol.Schema({
+            vol.Optional(
+                CONF_SCAN_INTERVAL,
+                default=options.get(CONF_SCAN_INTERVAL, int(DEFAULT_SCAN_INTERVAL.total_seconds())),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+            vol.Optional(
+                CONF_ADAPTIVE_POLLING,
+                default=options.get(CONF_ADAPTIVE_POLLING, False),
+            ): bool,
+            vol.Optional(
+                CONF_POLL_TIMEOUT,
+                default=options.get(CONF_POLL_TIMEOUT, DEFAULT_POLL_TIMEOUT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+            vol.Optional(
+                CONF_HUB_MODE,
+                default=options.get(CONF_HUB_MODE, False),
+            ): bool,
+            vol.Optional(
+                CONF_STREAMING,
+                default=options.get(CONF_STREAMING, False),
+            ): bool,
+            vol.Optional(
+                CONF_TEMPERATURE_DEADBAND,
+                default=options.get(CONF_TEMPERATURE_DEADBAND, 0),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+            vol.Optional(
+                CONF_HUMIDITY_DEADBAND,
+                default=options.get(CONF_HUMIDITY_DEADBAND, 0),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=20)),
+            vol.Optional(
+                CONF_CO2_DEADBAND,
+                default=options.get(CONF_CO2_DEADBAND, 0),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=500)),
+            vol.Optional(
+                CONF_HOME,
+                default=options.get(CONF_HOME, ""),
+            ): str,
+            vol.Optional(
+                CONF_HEATER_POWER,
+                default=options.get(CONF_HEATER_POWER, 0),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=20000)),
+            vol.Optional(
+                CONF_DUTY_CYCLE_WINDOWS,
+                default=options.get(CONF_DUTY_CYCLE_WINDOWS, [str(hours) for hours in DEFAULT_DUTY_CYCLE_WINDOWS]),
+            ): cv.multi_select({str(hours): f"{hours} h" for hours in DUTY_CYCLE_WINDOW_CHOICES}),
+        })
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=data_schema
+        )
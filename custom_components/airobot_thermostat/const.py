@@ -1,4 +1,121 @@
+from datetime import timedelta
+
 DOMAIN = "airobot_thermostat"
 API_URL_STATUS = "/api/thermostat/getStatuses"
 API_URL_GET_SETTINGS = "/api/thermostat/getSettings"
 API_URL_SET_SETTINGS = "/api/thermostat/setSettings"
+
+# Shared HTTP clients, keyed by host (see api.py)
+DATA_CLIENTS = f"{DOMAIN}_clients"
+
+# The thermostats are small embedded devices, keep the number of parallel connections low
+MAX_CONNECTIONS_PER_HOST = 2
+
+# Shared poll scheduler for hub mode (see hub.py)
+DATA_HUB = f"{DOMAIN}_hub"
+
+# Shared status relay for streaming mode (see relay.py)
+DATA_RELAY = f"{DOMAIN}_relay"
+
+# Options
+CONF_POLL_TIMEOUT = "poll_timeout"
+CONF_HUB_MODE = "hub_mode"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_HUMIDITY_DEADBAND = "humidity_deadband"
+CONF_CO2_DEADBAND = "co2_deadband"
+CONF_HOME = "home"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_HEATER_POWER = "heater_power"
+CONF_DUTY_CYCLE_WINDOWS = "duty_cycle_windows"
+CONF_STREAMING = "streaming"
+
+# Optional sensors the thermostat is known to have, stored in the config entry data
+CONF_CAPABILITIES = "capabilities"
+
+# Sent with the config entry id when a thermostat reports a new capability
+SIGNAL_NEW_CAPABILITIES = f"{DOMAIN}_new_capabilities_{{}}"
+
+DEFAULT_SCAN_INTERVAL = timedelta(seconds=15)
+
+# Adaptive polling: while the heater is idle and the readings are stable the
+# interval doubles on every poll, up to this multiple of the scan interval
+ADAPTIVE_MAX_FACTOR = 4
+
+# Adaptive polling: interval used for a while after a change made from Home Assistant
+ADAPTIVE_BOOST_INTERVAL = timedelta(seconds=5)
+ADAPTIVE_BOOST_DURATION = 120
+
+# Deadline in seconds for all requests of a single poll, and for each other request
+DEFAULT_POLL_TIMEOUT = 10
+
+# Settings rarely change, so they are refreshed less often than the status (seconds)
+SETTINGS_REFRESH_INTERVAL = 300
+
+# Number of thermostats the hub polls at the same time
+HUB_MAX_CONCURRENT_POLLS = 8
+
+# The hub checks which thermostats are due for a poll on every tick
+HUB_TICK_INTERVAL = timedelta(seconds=5)
+
+# Streaming mode reads the status of every thermostat this often,
+# with at most this many reads at the same time
+RELAY_INTERVAL = timedelta(seconds=1)
+RELAY_MAX_CONCURRENT = 16
+
+# Failed stream reads pause streaming for a thermostat, doubled on every failure (seconds).
+# The polls and writes alone decide when it is unreachable.
+STREAM_BASE_BACKOFF = 2
+STREAM_MAX_BACKOFF = 60
+
+# Number of thermostats written to at the same time by the bulk service
+BULK_MAX_CONCURRENT_WRITES = 8
+
+# Subnet discovery in the config flow: per-request deadline (seconds),
+# parallel probes and the largest range that may be scanned
+DISCOVERY_TIMEOUT = 2
+DISCOVERY_MAX_CONCURRENT = 64
+DISCOVERY_MAX_HOSTS = 1024
+
+# Setpoint changes made within this window are sent to the device as one write (seconds)
+WRITE_COALESCE_WINDOW = 0.5
+
+# Number of recent requests per endpoint kept for latency statistics
+METRICS_WINDOW = 100
+
+# Upper bounds of the request latency histogram buckets (seconds)
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+# Consecutive failures before the circuit breaker opens
+BREAKER_FAILURE_THRESHOLD = 3
+
+# Backoff after the breaker opens, doubled on every failed probe (seconds)
+BREAKER_BASE_BACKOFF = 30
+BREAKER_MAX_BACKOFF = 600
+
+# How early a probe is let through, timers can fire slightly before the backoff ends (seconds)
+BREAKER_PROBE_TOLERANCE = 1
+
+# Local history per thermostat: raw samples (one hour at 15 s polls),
+# per-minute aggregates for a day and hourly aggregates for a week
+HISTORY_RAW_SAMPLES = 240
+HISTORY_MINUTE_BUCKETS = 1440
+HISTORY_HOUR_BUCKETS = 168
+
+# Cache of the last known snapshot per config entry (see store.py)
+STORAGE_VERSION = 1
+
+# Delay before a changed state is written to the cache (seconds)
+STORAGE_SAVE_DELAY = 60
+
+# Heating analytics: duty cycle windows offered in the options (hours) and the default ones
+DUTY_CYCLE_WINDOW_CHOICES = (1, 6, 24, 168)
+DEFAULT_DUTY_CYCLE_WINDOWS = (1, 24)
+
+# Number of time buckets each duty cycle window is split into
+DUTY_CYCLE_BUCKETS = 60
+
+# Longer gaps between polls, like a restart, are not counted in the analytics (seconds)
+ANALYTICS_MAX_GAP = 1800
+
+# Heating time before a warm-up rate is reported for the cycle (seconds)
+ANALYTICS_MIN_WARMUP = 300
@@ -0,0 +1,37 @@
+import base64
+from .const import DOMAIN
+
+class AirobotDeviceContext:
+    """Values derived from the config of one thermostat, built once at setup.
+
+    Requests and entities used to rebuild these on every call, they never
+    change while the config entry is loaded.
+    """
+
+    __slots__ = ("room", "username", "headers", "device_info", "name_prefix", "unique_id_prefix")
+
+    def __init__(self, room, username, password):
+        self.room = room
+        self.username = username
+
+        # Headers for the REST API with Basic Authentication
+        credentials = base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("utf-8")
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Basic {credentials}",
+        }
+
+        self.device_info = {
+            "identifiers": {(DOMAIN, username)},
+            "name": f"Airobot {room} Thermostat",
+            "manufacturer": "Airobot",
+            "model": "Thermostat",
+        }
+        self.name_prefix = f"Airobot {room}"
+        self.unique_id_prefix = f"{DOMAIN}_{username}_{room}"
+
+    def entity_name(self, name):
+        return f"{self.name_prefix} {name}"
+
+    def unique_id(self, key):
+        return f"{self.unique_id_prefix}_{key}"
@@ -1,191 +1,578 @@
+import asyncio
 import logging
+import time
 from datetime import timedelta
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.components.climate.const import PRESET_HOME, PRESET_AWAY
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 import aiohttp
-import base64
-from .const import API_URL_STATUS, API_URL_GET_SETTINGS, API_URL_SET_SETTINGS, DOMAIN
+import traceback
+from .const import (
+    ADAPTIVE_BOOST_DURATION,
+    ADAPTIVE_BOOST_INTERVAL,
+    ADAPTIVE_MAX_FACTOR,
+    API_URL_STATUS,
+    API_URL_GET_SETTINGS,
+    API_URL_SET_SETTINGS,
+    CONF_CAPABILITIES,
+    DEFAULT_DUTY_CYCLE_WINDOWS,
+    DEFAULT_POLL_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    SETTINGS_REFRESH_INTERVAL,
+    SIGNAL_NEW_CAPABILITIES,
+    STREAM_BASE_BACKOFF,
+    STREAM_MAX_BACKOFF,
+    WRITE_COALESCE_WINDOW,
+)
+from .analytics import HeatingAnalytics
+from .breaker import STATE_HALF_OPEN, CircuitBreaker
+from .context import AirobotDeviceContext
+from .history import DeviceHistory, async_import_statistics
+from .metrics import FAILURE_AUTH, FAILURE_HTTP_STATUS, FAILURE_JSON, FAILURE_NETWORK, FAILURE_TIMEOUT, PollMetrics
+from .models import FIELD_NAMES, MODE_AWAY, MODE_HOME, OPTIONAL_FIELDS, parse_payloads
 
 _LOGGER = logging.getLogger(__name__)
 
 class AirobotDataUpdateCoordinator(DataUpdateCoordinator):
 
-    def __init__(self, hass, room, host, username, password):
+    def __init__(self, hass, client, room, host, username, password, poll_timeout=DEFAULT_POLL_TIMEOUT, hub_mode=False, deadbands=None, store=None, capabilities=(), scan_interval=DEFAULT_SCAN_INTERVAL, adaptive=False, heater_power=0, duty_cycle_windows=DEFAULT_DUTY_CYCLE_WINDOWS):
         """Initialize the coordinator."""
+        self._client = client
+        self._store = store
+        # Optional fields the device has reported a valid value for
+        self.capabilities = set(capabilities)
+        self.metrics = PollMetrics()
+        self.history = DeviceHistory()
+        self.heater_power = heater_power
+        self.analytics = HeatingAnalytics([hours * 3600 for hours in duty_cycle_windows], heater_power)
+        self._poll_timeout = poll_timeout
+        # Minimum change per field before a new value is published to the entities
+        self._deadbands = deadbands or {}
+        self._published = None
+        # Fields whose published value changed on the last poll, and a counter of published snapshots
+        self.changed_fields = set()
+        self.generation = 0
+        # Values shown on the entities while a write to the device is pending
+        self._optimistic = {}
+        self._pending_setpoint = None
+        self._write_task = None
+        # Queued setpoints and bulk writes are sent one at a time per device
+        self._write_lock = asyncio.Lock()
+        self._status_data = None
+        self._settings_data = None
+        self._settings_refreshed_at = None
+        self._settings_stale = True
         self._room = room
         self._host = host
         self._username = username
         self._password = password
+        # Headers, device info and entity ids are built once
+        self.context = AirobotDeviceContext(room, username, password)
+        self.breaker = CircuitBreaker()
+        self._scan_interval = scan_interval
+        self._adaptive = adaptive
+        # Adaptive polling state: multiple of the scan interval while stable, and the end of the boost after a change
+        self._idle_factor = 1
+        self._boost_until = 0
+        # Current interval between polls, and the start of the last poll (monotonic)
+        self.poll_interval = scan_interval
+        self.last_poll_at = None
+        # Consecutive failed stream reads, and the end of the pause they caused (monotonic)
+        self._stream_failures = 0
+        self._stream_paused_until = 0
+
+        # In hub mode the hub schedules the polls instead of the coordinator
+        self._hub_mode = hub_mode
 
         super().__init__(
             hass,
             _LOGGER,
             name=f"Airobot Thermostat {self._room}",
-            update_interval=timedelta(seconds=15),
+            update_interval=None if hub_mode else scan_interval,
         )
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, self._username)},
-            "name": f"Airobot {self._room} Thermostat",
-            "manufacturer": "Airobot",
-            "model": "Thermostat",
-        }
+    async def _async_request(self, method, path, name, payload=None, deadline=None):
+        """Send a request and record it in the metrics.
 
-    def _get_headers(self):
-        """Return the headers for REST API with proper Basic Authentication."""
-        credentials = f"{self._username}:{self._password}"
-        encoded_credentials = base64.b64encode(credentials.encode("utf-8")).decode("utf-8")
-        return {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        The request gets the poll timeout, or the time left until `deadline`
+        (monotonic) when it is part of a poll.
+        """
+        start = time.monotonic()
+        timeout = self._poll_timeout if deadline is None else max(0, deadline - start)
+        try:
+            status, body = await asyncio.wait_for(
+                self._client.async_request(method, path, self.context.headers, payload),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            self.metrics.record_failure(name, FAILURE_TIMEOUT)
+            raise
+        except aiohttp.ClientError:
+            self.metrics.record_failure(name, FAILURE_NETWORK)
+            raise
+
+        self.metrics.record_request(name, time.monotonic() - start, len(body))
+        if status in (401, 403):
+            self.metrics.record_failure(name, FAILURE_AUTH)
+        elif status != 200:
+            self.metrics.record_failure(name, FAILURE_HTTP_STATUS)
+        return status, body
+
+    async def _async_get_json(self, path, name, deadline=None):
+        """Fetch a JSON document from the thermostat, see _async_request for the deadline."""
+        status, body = await self._async_request("GET", path, name, deadline=deadline)
+        if status != 200:
+            raise UpdateFailed(f"Failed to fetch {name} data: {status}")
+        try:
+            # orjson decodes the raw bytes directly, without decoding them to text first
+            data = json_loads(body)
+        except ValueError:
+            self.metrics.record_failure(name, FAILURE_JSON)
+            raise
+
+        # Log the received data for debugging
+        _LOGGER.debug("Received %s data from thermostat: %s", name, data)
+        return data
+
+    def _describe_error(self, err):
+        """Return a readable description of a failed request."""
+        if isinstance(err, UpdateFailed):
+            return str(err)
+        if isinstance(err, asyncio.TimeoutError):
+            return f"Timed out after {self._poll_timeout} seconds"
+        if isinstance(err, aiohttp.ClientError):
+            return f"Network error: {err}"
+        if isinstance(err, ValueError):
+            return f"JSON decoding error: {err}"
+        return f"Unexpected error: {err}"
+
+    def _settings_due(self):
+        """Return True when the settings should be fetched on this poll."""
+        if self._settings_stale or self._settings_refreshed_at is None:
+            return True
+        return time.monotonic() - self._settings_refreshed_at >= SETTINGS_REFRESH_INTERVAL
+
+    def _settings_changed(self, status_data):
+        """Return True when the status data suggests the settings were changed on the device."""
+        if self._settings_data is None or "SETPOINT_TEMP" not in status_data:
+            return False
+
+        # The status payload reports the active setpoint, compare it to the one for the known mode
+        mode = self._settings_data.get("MODE", MODE_HOME)
+        setpoint_field = "SETPOINT_TEMP_AWAY" if mode == MODE_AWAY else "SETPOINT_TEMP"
+        return status_data["SETPOINT_TEMP"] != self._settings_data.get(setpoint_field)
 
     async def _async_update_data(self):
-        status_url = f"http://{self._host}{API_URL_STATUS}"
-        get_settings_url = f"http://{self._host}{API_URL_GET_SETTINGS}"
+        if self.breaker.is_open:
+            # Refreshed before the backoff ended, probe when it does instead of a full backoff later
+            if not self._hub_mode:
+                self.update_interval = timedelta(seconds=self.breaker.retry_in)
+            raise UpdateFailed(f"{self._host} is unreachable, retrying in {self.breaker.retry_in:.0f} seconds")
 
-        _LOGGER.debug("Fetching status data from URL: %s", status_url)
-        _LOGGER.debug("Fetching settings data from URL: %s", get_settings_url)
-        
+        start = self.last_poll_at = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                # Fetch data from the status API
-                async with session.get(status_url, headers=self._get_headers()) as status_response:
-                    if status_response.status != 200:
-                        raise UpdateFailed(f"Failed to fetch status data: {status_response.status}")
-                    status_data = await status_response.json()
-
-                    # Log the received status data for debugging
-                    _LOGGER.debug("Received status data from thermostat: %s", status_data)
-
-                # Fetch data from the settings API (for mode)
-                async with session.get(get_settings_url, headers=self._get_headers()) as settings_response:
-                    if settings_response.status != 200:
-                        raise UpdateFailed(f"Failed to fetch settings data: {settings_response.status}")
-                    settings_data = await settings_response.json()
-
-                    # Log the received settings data for debugging
-                    _LOGGER.debug("Received settings data from thermostat: %s", settings_data)
-
-            preset_mode = settings_data.get("MODE", 1)  # Default to 1 (Home mode)
-            setpoint_temp = settings_data.get("SETPOINT_TEMP_AWAY", 0) / 10 if preset_mode == 2 else settings_data.get("SETPOINT_TEMP", 0) / 10
-            # Check if CO2 is valid (not 65535)
-            co2_value = status_data.get("CO2", 65535)
-            if co2_value == 65535:
-                co2_value = None  # Set to None to indicate no valid CO2 reading
-
-            hum_air_value = status_data.get("HUM_AIR", 0) / 10
-            if hum_air_value > 100:
-                hum_air_value = None
-            
-            temp_air_value = status_data.get("TEMP_AIR", 0) / 10
-            if temp_air_value > 100:
-                temp_air_value = None
-
-            floor_temperature = status_data.get("TEMP_FLOOR", 0) / 10
-            floor_temperature_available = 0 < floor_temperature < 100
-            if not floor_temperature_available:
-                floor_temperature = None
-
-
-            return {
-                "temperature": temp_air_value,
-                "floor_temperature": floor_temperature,
-                "floor_temperature_available": floor_temperature_available,
-                "humidity": hum_air_value,
-                "co2": co2_value,
-                "aqi": status_data.get("AQI", 0),
-                "setpoint_temp": setpoint_temp,
-                "preset_mode": preset_mode,
-                "heating_on": status_data.get("STATUS_FLAGS", [{}])[0].get("HEATING_ON", 0),
-            }
-        
-        except aiohttp.ClientError as e:
-            raise UpdateFailed(f"Network error: {e}")
-        except ValueError as e:
-            raise UpdateFailed(f"JSON decoding error: {e}")
+            data = await self._async_poll()
+        except UpdateFailed:
+            self._record_failure()
+            raise
+        finally:
+            self.metrics.last_poll_duration = time.monotonic() - start
+
+        self._record_success()
+        self._set_poll_interval(self._next_poll_interval())
+        return data
+
+    def _next_poll_interval(self):
+        """Return the interval until the next poll, based on the last published data."""
+        if not self._adaptive:
+            return self._scan_interval
+
+        if time.monotonic() < self._boost_until:
+            # Right after a change, follow how the device reacts
+            self._idle_factor = 1
+            return min(self._scan_interval, ADAPTIVE_BOOST_INTERVAL)
+
+        if self.changed_fields or (self._published is not None and self._published.heating_on):
+            self._idle_factor = 1
+            return self._scan_interval
+
+        self._idle_factor = min(self._idle_factor * 2, ADAPTIVE_MAX_FACTOR)
+        return self._scan_interval * self._idle_factor
+
+    def _set_poll_interval(self, interval):
+        if interval != self.poll_interval:
+            _LOGGER.debug("Polling %s every %s", self._host, interval)
+        self.poll_interval = interval
+        if not self._hub_mode:
+            self.update_interval = interval
+
+    def _boost_polling(self):
+        """Poll faster for a while after a change made from Home Assistant."""
+        if not self._adaptive:
+            return
+        self._boost_until = time.monotonic() + ADAPTIVE_BOOST_DURATION
+        self._set_poll_interval(self._next_poll_interval())
+
+    def poll_due(self, tolerance=0):
+        """Return True when the next poll is due, used by the hub."""
+        if self.last_poll_at is None:
+            return True
+        return time.monotonic() - self.last_poll_at + tolerance >= self.poll_interval.total_seconds()
+
+    def _record_success(self):
+        """Reset the failure count after a successful request."""
+        if not self.breaker.failures:
+            return
+
+        recovered = self.breaker.backoff is not None
+        self.breaker.record_success()
+        if recovered:
+            _LOGGER.info("%s is reachable again", self._host)
+            # Brings the interval back from the backoff
+            self._set_poll_interval(self._next_poll_interval())
+
+    def _record_failure(self):
+        """Count a failed request and back off once the device looks unreachable."""
+        backoff = self.breaker.record_failure()
+        if backoff is None:
+            return
+
+        _LOGGER.warning(
+            "%s failed %s times in a row, backing off for %.0f seconds",
+            self._host, self.breaker.failures, backoff,
+        )
+        # The probe after the backoff is the next scheduled poll, the hub skips open breakers itself
+        if not self._hub_mode:
+            self.update_interval = timedelta(seconds=backoff)
+
+    async def _async_poll(self):
+        # Entities only write their state for fields changed by a successful poll
+        self.changed_fields = set()
+        # All requests of the poll, including a follow-up settings fetch, share one deadline
+        deadline = time.monotonic() + self._poll_timeout
+
+        # Status is fetched on every poll, settings only when they have likely changed.
+        # A probe after a backoff only asks for the status.
+        settings_result = None
+        if self._settings_due() and self.breaker.state != STATE_HALF_OPEN:
+            _LOGGER.debug("Fetching status and settings data from host: %s", self._host)
+            # Both endpoints are fetched at the same time, each bounded by the poll deadline
+            status_result, settings_result = await asyncio.gather(
+                self._async_get_json(API_URL_STATUS, "status", deadline),
+                self._async_get_json(API_URL_GET_SETTINGS, "settings", deadline),
+                return_exceptions=True,
+            )
+        else:
+            _LOGGER.debug("Fetching status data from host: %s", self._host)
+            status_result, = await asyncio.gather(
+                self._async_get_json(API_URL_STATUS, "status", deadline),
+                return_exceptions=True,
+            )
+            if not isinstance(status_result, Exception) and self._settings_changed(status_result):
+                _LOGGER.debug("Setpoint changed on %s, fetching settings data", self._host)
+                settings_result, = await asyncio.gather(
+                    self._async_get_json(API_URL_GET_SETTINGS, "settings", deadline),
+                    return_exceptions=True,
+                )
+
+        status_failed = isinstance(status_result, Exception)
+        settings_failed = isinstance(settings_result, Exception)
+
+        if status_failed and (settings_result is None or settings_failed):
+            raise UpdateFailed(self._describe_error(status_result))
+
+        # When only one endpoint fails, keep the last known payload for it
+        if status_failed:
+            if self._status_data is None:
+                raise UpdateFailed(self._describe_error(status_result))
+            _LOGGER.warning("Using previous status data for %s: %s", self._host, self._describe_error(status_result))
+        else:
+            self._status_data = status_result
+
+        if settings_failed:
+            if self._settings_data is None:
+                raise UpdateFailed(self._describe_error(settings_result))
+            # The settings stay stale, so they are fetched again on the next poll
+            _LOGGER.warning("Using previous settings data for %s: %s", self._host, self._describe_error(settings_result))
+        elif settings_result is not None:
+            self._settings_data = settings_result
+            self._settings_refreshed_at = time.monotonic()
+            self._settings_stale = False
+
+        parse_start = time.monotonic()
+        try:
+            data = parse_payloads(self._status_data, self._settings_data)
         except Exception as e:
             raise UpdateFailed(f"Unexpected error: {e}")
-    
-    async def _set_temperature(self, target_temp: float):
-        url = f"http://{self._host}{API_URL_SET_SETTINGS}"
-        _LOGGER.debug("Setting temperature to %s on URL: %s", target_temp, url)
-        
-        # Determine which field to update based on the current mode: 1 = Home, 0 = Away
-        current_mode = self.data.get("mode", 1)  # Default to Home if mode is missing
+        self.metrics.record_success(time.monotonic() - parse_start)
 
-        # Select the correct temperature field based on the mode
-        temp_field = "SETPOINT_TEMP" if current_mode == 1 else "SETPOINT_TEMP_AWAY"
+        # Every raw sample goes into the local history, hours that completed become statistics
+        now = dt_util.utcnow().timestamp()
+        completed = self.history.add(now, data)
+        async_import_statistics(self.hass, self._username, self._room, completed)
+        self.analytics.update(now, data)
 
-        # Construct the payload
-        payload = {
-            "DEVICE_ID": self._username,  # Assuming the username is used as DEVICE_ID
-            temp_field: int(target_temp * 10),  # Convert temperature to tenths of a degree
+        data = self._publish(data)
+
+        # The analytics keep counting while the heater is on, even if no reading changed
+        if self._store is not None and (self.changed_fields or data.heating_on):
+            self._store.async_schedule_save(self)
+
+        # Every poll re-validates the capabilities, a valid reading confirms one for good
+        new_capabilities = {
+            field for field in OPTIONAL_FIELDS
+            if field not in self.capabilities and getattr(data, field) is not None
         }
+        if new_capabilities:
+            self._async_add_capabilities(new_capabilities)
+        return data
+
+    @callback
+    def _async_add_capabilities(self, new_capabilities):
+        """Remember newly confirmed capabilities and let the platforms add their entities."""
+        _LOGGER.info("%s reported new capabilities: %s", self._host, ", ".join(sorted(new_capabilities)))
+        self.capabilities |= new_capabilities
+        if self.config_entry is None:
+            return
+
+        # Stored with the config entry, so they are known right away on the next start
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            data={**self.config_entry.data, CONF_CAPABILITIES: sorted(self.capabilities)},
+        )
+        async_dispatcher_send(self.hass, SIGNAL_NEW_CAPABILITIES.format(self.config_entry.entry_id), new_capabilities)
+
+    def stream_due(self):
+        """Return True unless streaming is paused after failed reads, used by the relay."""
+        return time.monotonic() >= self._stream_paused_until
+
+    async def async_stream_status(self):
+        """Read only the status and push the values that changed, used by the relay."""
+        if self._status_data is None or self._settings_data is None:
+            # Not polled yet, the first poll publishes everything
+            return
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=self._get_headers()) as response:
-                    _LOGGER.debug("Response status: %s", response.status)
-                    
-                    if response.status != 200:
-                        response_text = await response.text()
-                        _LOGGER.error("Failed to set temperature. Status: %s, Response: %s", response.status, response_text)
-                        raise UpdateFailed(f"Failed to set temperature: {response.status}")
-
-                    # Log success and return the response for further use if needed
-                    _LOGGER.info("Successfully set temperature to %s", target_temp)
+            status_data = await self._async_get_json(API_URL_STATUS, "status")
+        except (asyncio.TimeoutError, aiohttp.ClientError, ValueError, UpdateFailed) as err:
+            _LOGGER.debug("Streaming from %s failed: %s", self._host, self._describe_error(err))
+            # Only streaming backs off, a short blip must not make the entities unavailable
+            self._stream_failures += 1
+            self._stream_paused_until = time.monotonic() + min(
+                STREAM_MAX_BACKOFF, STREAM_BASE_BACKOFF * 2 ** (self._stream_failures - 1)
+            )
+            return
 
-        except aiohttp.ClientError as e:
-            _LOGGER.error("Network error when setting temperature on %s: %s", self._host, str(e))
-            raise UpdateFailed(f"Network error: {e}")
-        except ValueError as e:
-            _LOGGER.error("JSON decoding error: %s. Response text: %s", str(e), traceback.format_exc())
-            raise UpdateFailed(f"JSON decoding error: {e}")
+        self._stream_failures = 0
+        self._status_data = status_data
+        if self._settings_changed(status_data):
+            # The setpoint was changed on the device, let a full poll fetch the settings
+            self._settings_stale = True
+            await self.async_request_refresh()
+            return
+
+        try:
+            data = parse_payloads(self._status_data, self._settings_data)
         except Exception as e:
-            _LOGGER.error("Unexpected error: %s. Traceback: %s", str(e), traceback.format_exc())
-            raise UpdateFailed(f"Unexpected error: {e}")
-    
-    # this function is not available because Airobot does not supporting each thermostat mode independently
-    # at least in the official app it allows only changing whole home status.
-    """
-    async def _set_preset_mode(self, preset_mode: str):
-        url = f"http://{self._host}{API_URL_SET_SETTINGS}"
-        
-        # Determine the mode-specific settings (e.g., temperature for home/away)
-        if preset_mode == PRESET_HOME:
-            mode = 1  # Example mode for "Home"
-        elif preset_mode == PRESET_AWAY:
-            mode = 2  # Example mode for "Away"
+            _LOGGER.debug("Streaming from %s failed: Unexpected error: %s", self._host, e)
+            return
+
+        data = self._publish(data)
+        if self.changed_fields:
+            # Unlike async_set_updated_data this leaves the poll timer alone, so
+            # frequent changes don't keep postponing the regular polls
+            self.data = data
+            self.async_update_listeners()
+
+    @callback
+    def async_restore(self, data):
+        """Publish a snapshot from the cache, before the first poll has finished."""
+        self._published = data
+        self.changed_fields = set(FIELD_NAMES)
+        self.generation += 1
+        self.data = data
+
+    def _publish(self, data):
+        """Diff a parsed snapshot against the published one and return the new published snapshot."""
+        # Pending writes take precedence over what the device reported before the write
+        if self._optimistic:
+            data = data.replace(**self._optimistic)
+
+        if self._published is None:
+            changed = set(FIELD_NAMES)
         else:
-            _LOGGER.error("Unsupported preset mode: %s", preset_mode)
+            changes = {}
+            for field in FIELD_NAMES:
+                old = getattr(self._published, field)
+                new = getattr(data, field)
+                if self._value_changed(field, old, new):
+                    changes[field] = new
+            changed = set(changes)
+            data = self._published.replace(**changes) if changes else self._published
+
+        if changed:
+            _LOGGER.debug("Changed fields on %s: %s", self._host, changed)
+            self.generation += 1
+        self.changed_fields = changed
+        self._published = data
+        return data
+
+    def _value_changed(self, field, old, new):
+        """Return True when a value moved beyond the deadband of its field."""
+        deadband = self._deadbands.get(field, 0)
+        if deadband and isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            # Values are rounded to tenths, so 21.6 - 21.5 must not count as more than 0.1
+            return abs(new - old) > deadband + 1e-6
+        return old != new
+
+    @callback
+    def async_queue_temperature(self, target_temp: float):
+        """Queue a setpoint write and show the new setpoint right away.
+
+        Changes made in quick succession are coalesced into a single write of
+        the last value, and at most one write per device is in flight.
+        """
+        if self.breaker.is_open:
+            raise HomeAssistantError(f"Airobot {self._room} thermostat is unreachable")
+
+        self._pending_setpoint = target_temp
+        self._optimistic["setpoint_temp"] = target_temp
+
+        self._published = self._published.replace(setpoint_temp=target_temp)
+        self.changed_fields = {"setpoint_temp"}
+        self.generation += 1
+        self.data = self._published
+        self.async_update_listeners()
+
+        if self._write_task is None or self._write_task.done():
+            # Tied to the config entry, so a queued write is cancelled when the entry unloads
+            if self.config_entry is not None:
+                self._write_task = self.config_entry.async_create_background_task(
+                    self.hass, self._async_write_pending(), f"airobot write {self._room}"
+                )
+            else:
+                self._write_task = self.hass.async_create_task(self._async_write_pending())
+
+    async def _async_write_pending(self):
+        """Write queued setpoints until none are left, then reconcile with the device."""
+        while self._pending_setpoint is not None:
+            written = None
+            while self._pending_setpoint is not None:
+                # Give further changes a moment to arrive before writing
+                await asyncio.sleep(WRITE_COALESCE_WINDOW)
+                target_temp = self._pending_setpoint
+                self._pending_setpoint = None
+                try:
+                    await self._set_temperature(target_temp)
+                    written = target_temp
+                except UpdateFailed:
+                    # Already logged, the confirmation read rolls the setpoint back
+                    self._settings_stale = True
+                    written = None
+
+            # Changes queued during the confirmation are written on the next round
+            await self._async_confirm_write(written)
+
+    async def _async_confirm_write(self, written):
+        """Read the settings back right after a write and publish what the device reports.
+
+        This replaces the optimistic setpoint within one round trip, instead of
+        waiting for the next poll. `written` is None when the write failed, in
+        which case the setpoint shown is rolled back to the one on the device.
+        """
+        try:
+            settings_data = await self._async_get_json(API_URL_GET_SETTINGS, "settings")
+        except (asyncio.TimeoutError, aiohttp.ClientError, ValueError, UpdateFailed) as err:
+            _LOGGER.debug("Could not confirm the settings of %s: %s", self._host, self._describe_error(err))
+            if self._pending_setpoint is None:
+                self._optimistic.clear()
+            # The full poll also fetches the settings, they are stale
+            await self.async_request_refresh()
+            return
+
+        self._settings_data = settings_data
+        self._settings_refreshed_at = time.monotonic()
+        self._settings_stale = False
+        if self._pending_setpoint is None:
+            self._optimistic.clear()
+
+        if self._status_data is None:
+            # Started from the cache and not polled yet, a full poll is needed to publish
+            await self.async_request_refresh()
             return
 
+        data = self._publish(parse_payloads(self._status_data, self._settings_data))
+        if written is not None and data.setpoint_temp != written and not self._optimistic:
+            _LOGGER.warning(
+                "%s reports a setpoint of %s after %s was written", self._host, data.setpoint_temp, written
+            )
+        self.async_set_updated_data(data)
+
+    async def _set_temperature(self, target_temp: float):
+        _LOGGER.debug("Setting temperature to %s on host: %s", target_temp, self._host)
+        await self.async_write_settings(target_temp=target_temp)
+
+    async def async_write_settings(self, target_temp=None, mode=None):
+        """Write a setpoint and/or a mode to the device in a single request.
+
+        The setpoint is written for the new mode when one is given, for the
+        current mode otherwise. Raises UpdateFailed when the write failed.
+        """
+        async with self._write_lock:
+            await self._async_write_settings(target_temp, mode)
+
+    async def _async_write_settings(self, target_temp, mode):
+        # Fail fast instead of waiting on a device that is known to be unreachable
+        if self.breaker.is_open:
+            raise UpdateFailed(f"{self._host} is unreachable")
+
         payload = {
-            "DEVICE_ID": self._username,
-            "MODE": mode
+            "DEVICE_ID": self._username,  # Assuming the username is used as DEVICE_ID
         }
-
-        _LOGGER.debug("Setting preset mode to %s with payload: %s", preset_mode, payload)
+        if mode is not None:
+            payload["MODE"] = mode
+        elif self._settings_data is not None:
+            # The raw settings also know a mode written by an earlier bulk write or preset switch
+            mode = self._settings_data.get("MODE", MODE_HOME)
+        else:
+            mode = self.data.preset_mode
+        if target_temp is not None:
+            # Select the correct temperature field based on the mode, in tenths of a degree
+            temp_field = "SETPOINT_TEMP_AWAY" if mode == MODE_AWAY else "SETPOINT_TEMP"
+            payload[temp_field] = round(target_temp * 10)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=self._get_headers()) as response:
-                    _LOGGER.debug("Response status: %s", response.status)
+            status, body = await self._async_request("POST", API_URL_SET_SETTINGS, "set_settings", payload)
+            _LOGGER.debug("Response status: %s", status)
 
-                    if response.status != 200:
-                        response_text = await response.text()
-                        _LOGGER.error("Failed to set preset mode. Status: %s, Response: %s", response.status, response_text)
-                        raise UpdateFailed(f"Failed to set preset mode: {response.status}")
+            if status != 200:
+                _LOGGER.error("Failed to write settings %s. Status: %s, Response: %s", payload, status, body.decode("utf-8", "replace"))
+                raise UpdateFailed(f"Failed to write settings: {status}")
 
-                    _LOGGER.info("Successfully set preset mode to %s", preset_mode)
+            # Log success and make sure the next poll picks up the new settings
+            _LOGGER.info("Successfully wrote settings %s to %s", payload, self._host)
+            self._settings_stale = True
+            if "MODE" in payload and self._settings_data is not None:
+                # Setpoints written before the settings are read back go to the field of the new mode
+                self._settings_data = {**self._settings_data, "MODE": payload["MODE"]}
+            self._boost_polling()
 
+        except UpdateFailed:
+            raise
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timed out when writing settings to %s", self._host)
+            self._record_failure()
+            raise UpdateFailed(f"Timed out after {self._poll_timeout} seconds")
         except aiohttp.ClientError as e:
-            _LOGGER.error("Network error when setting preset mode on %s: %s", self._host, str(e))
+            _LOGGER.error("Network error when writing settings to %s: %s", self._host, str(e))
+            self._record_failure()
             raise UpdateFailed(f"Network error: {e}")
+        except ValueError as e:
+            _LOGGER.error("JSON decoding error: %s. Response text: %s", str(e), traceback.format_exc())
+            raise UpdateFailed(f"JSON decoding error: {e}")
         except Exception as e:
             _LOGGER.error("Unexpected error: %s. Traceback: %s", str(e), traceback.format_exc())
             raise UpdateFailed(f"Unexpected error: {e}")
-    """
\ No newline at end of file
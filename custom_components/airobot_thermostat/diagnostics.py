@@ -0,0 +1,28 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import DOMAIN
+
+TO_REDACT = {"password"}
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "last_update_success": coordinator.last_update_success,
+        "poll_interval": coordinator.poll_interval.total_seconds(),
+        "data": coordinator.data.as_dict() if coordinator.data else None,
+        "capabilities": sorted(coordinator.capabilities),
+        "metrics": coordinator.metrics.as_dict(),
+        "circuit_breaker": coordinator.breaker.as_dict(),
+        "analytics": {
+            "runtime": coordinator.analytics.runtime,
+            "energy": coordinator.analytics.energy,
+            "warmup_rate": coordinator.analytics.warmup_rate,
+        },
+    }
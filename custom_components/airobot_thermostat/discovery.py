@@ -0,0 +1,124 @@
+import asyncio
+import ipaddress
+import logging
+import aiohttp
+from aiohttp import BasicAuth
+from .const import API_URL_STATUS, DISCOVERY_MAX_CONCURRENT, DISCOVERY_MAX_HOSTS, DISCOVERY_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+class CannotConnect(Exception):
+    """The thermostat did not answer."""
+
+class InvalidAuth(Exception):
+    """The thermostat refused the credentials."""
+
+class InvalidNetwork(Exception):
+    """The network to scan could not be parsed or is too large."""
+
+def parse_hosts(value, max_hosts=DISCOVERY_MAX_HOSTS):
+    """Return the hosts of a network ("192.168.1.0/24") or range ("192.168.1.10-192.168.1.50")."""
+    value = value.strip()
+    try:
+        if "-" in value:
+            first, last = (ipaddress.ip_address(part.strip()) for part in value.split("-", 1))
+            hosts = [first + offset for offset in range(min(int(last) - int(first) + 1, max_hosts + 1))]
+        else:
+            network = ipaddress.ip_network(value, strict=False)
+            # Checked before listing the hosts, a large network would take a while to list
+            if network.num_addresses > max_hosts + 2:
+                raise InvalidNetwork(f"{value} has more than {max_hosts} addresses")
+            hosts = list(network.hosts())
+    except ValueError as err:
+        raise InvalidNetwork(f"{value} is not a network or range") from err
+
+    if not hosts:
+        raise InvalidNetwork(f"{value} has no addresses")
+    if len(hosts) > max_hosts:
+        raise InvalidNetwork(f"{value} has more than {max_hosts} addresses")
+    return [str(host) for host in hosts]
+
+def parse_credentials(value):
+    """Parse one "device_id,password[,room]" per line into a list of dicts."""
+    credentials = []
+    for line in value.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        parts = [part.strip() for part in line.split(",", 2)]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            raise ValueError(f"Invalid credentials line: {line}")
+        credentials.append({
+            "username": parts[0],
+            "password": parts[1],
+            "room": parts[2] if len(parts) > 2 and parts[2] else parts[0],
+        })
+    return credentials
+
+async def async_probe(session, host, timeout=DISCOVERY_TIMEOUT):
+    """Return True when the host answers the status endpoint like a thermostat."""
+    try:
+        async with asyncio.timeout(timeout):
+            async with session.get(f"http://{host}{API_URL_STATUS}", allow_redirects=False) as response:
+                # Without credentials a thermostat answers 401
+                return response.status in (200, 401, 403)
+    except (asyncio.TimeoutError, aiohttp.ClientError, OSError):
+        return False
+
+async def async_scan(session, hosts, timeout=DISCOVERY_TIMEOUT, max_concurrent=DISCOVERY_MAX_CONCURRENT):
+    """Probe all hosts concurrently and return the ones that look like thermostats."""
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def async_probe_host(host):
+        async with semaphore:
+            return await async_probe(session, host, timeout)
+
+    found = await asyncio.gather(*(async_probe_host(host) for host in hosts))
+    return [host for host, is_thermostat in zip(hosts, found) if is_thermostat]
+
+async def async_validate(session, host, username, password, timeout=DISCOVERY_TIMEOUT):
+    """Check the credentials against a thermostat, raising CannotConnect or InvalidAuth."""
+    try:
+        async with asyncio.timeout(timeout):
+            async with session.get(
+                f"http://{host}{API_URL_STATUS}", auth=BasicAuth(username, password), allow_redirects=False
+            ) as response:
+                status = response.status
+                await response.read()
+    except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as err:
+        raise CannotConnect(f"{host} did not answer: {err}") from err
+
+    if status in (401, 403):
+        raise InvalidAuth(f"{host} refused the credentials of {username}")
+    if status != 200:
+        raise CannotConnect(f"{host} answered with status {status}")
+
+async def async_match_credentials(session, hosts, credentials, timeout=DISCOVERY_TIMEOUT):
+    """Find the credentials of every host, checking all hosts in parallel.
+
+    Each host tries the credentials that are not matched yet one at a time,
+    which keeps the load on the small devices low. Returns a list of dicts
+    with the host, username, password and room of every matched thermostat.
+    """
+    unmatched = list(credentials)
+
+    async def async_match(host):
+        for candidate in list(unmatched):
+            if candidate not in unmatched:
+                continue
+            try:
+                await async_validate(session, host, candidate["username"], candidate["password"], timeout)
+            except InvalidAuth:
+                continue
+            except CannotConnect as err:
+                _LOGGER.debug("Giving up on %s: %s", host, err)
+                return None
+            # Another host may have matched the same credentials meanwhile
+            if candidate not in unmatched:
+                continue
+            unmatched.remove(candidate)
+            return {"host": host, **candidate}
+        return None
+
+    matches = await asyncio.gather(*(async_match(host) for host in hosts))
+    return [match for match in matches if match is not None]
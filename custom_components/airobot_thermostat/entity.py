@@ -0,0 +1,46 @@
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+class AirobotEntity(CoordinatorEntity):
+    """Base class for entities backed by the Airobot coordinator.
+
+    The state is derived from the coordinator data into the `_attr_` values once
+    per published snapshot, instead of on every property call.
+    """
+
+    # Coordinator data fields the state of the entity depends on
+    _fields = ()
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._last_available = None
+        # Coordinator generation the `_attr_` values were derived from
+        self._generation = None
+        self._attr_device_info = coordinator.context.device_info
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._update_from_coordinator()
+
+    def _update_from_coordinator(self):
+        """Derive the state again when the coordinator published a new snapshot."""
+        generation = self.coordinator.generation
+        if generation == self._generation or self.coordinator.data is None:
+            return
+
+        self._generation = generation
+        self._update_from_data(self.coordinator.data)
+
+    def _update_from_data(self, data):
+        """Set the `_attr_` values derived from a snapshot."""
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state only when availability or one of the entity's fields changed."""
+        available = self.available
+        if available == self._last_available and self.coordinator.changed_fields.isdisjoint(self._fields):
+            return
+
+        self._last_available = available
+        self._update_from_coordinator()
+        self.async_write_ha_state()
@@ -0,0 +1,190 @@
+import logging
+from array import array
+from datetime import datetime, timezone
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+from .const import (
+    DOMAIN,
+    HISTORY_HOUR_BUCKETS,
+    HISTORY_MINUTE_BUCKETS,
+    HISTORY_RAW_SAMPLES,
+)
+from .models import FIELDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Snapshot fields kept in the history
+HISTORY_FIELDS = ("temperature", "floor_temperature", "humidity", "co2")
+
+RESOLUTION_RAW = "raw"
+RESOLUTION_MINUTE = "minute"
+RESOLUTION_HOUR = "hour"
+RESOLUTIONS = (RESOLUTION_RAW, RESOLUTION_MINUTE, RESOLUTION_HOUR)
+
+_UNITS = {field.key: field.unit for field in FIELDS}
+
+class SampleRing:
+    """Fixed-size ring of raw (timestamp, value) samples."""
+
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        # Single precision is plenty for tenths of a degree and ppm values
+        self._values = array("f", [0.0]) * capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, timestamp, value):
+        self._timestamps[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def samples(self, since=0):
+        """Yield (timestamp, value) from the oldest to the newest sample."""
+        first = (self._next - self._size) % self._capacity
+        for offset in range(self._size):
+            index = (first + offset) % self._capacity
+            if self._timestamps[index] >= since:
+                yield self._timestamps[index], self._values[index]
+
+class AggregateRing:
+    """Fixed-size ring of min/max/mean aggregates over equal time buckets."""
+
+    def __init__(self, bucket_seconds, capacity):
+        self._bucket_seconds = bucket_seconds
+        self._capacity = capacity
+        self._starts = array("d", [0.0]) * capacity
+        self._mins = array("f", [0.0]) * capacity
+        self._maxs = array("f", [0.0]) * capacity
+        self._sums = array("d", [0.0]) * capacity
+        self._counts = array("L", [0]) * capacity
+        self._head = -1
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, timestamp, value):
+        """Add a sample and return the aggregate of the bucket it closed, if any."""
+        start = timestamp - timestamp % self._bucket_seconds
+        head = self._head
+        if self._size and start == self._starts[head]:
+            if value < self._mins[head]:
+                self._mins[head] = value
+            if value > self._maxs[head]:
+                self._maxs[head] = value
+            self._sums[head] += value
+            self._counts[head] += 1
+            return None
+
+        if self._size and start < self._starts[head]:
+            # The clock went backwards, don't reorder the buckets
+            return None
+
+        closed = self._aggregate(head) if self._size else None
+        head = self._head = (head + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+        self._starts[head] = start
+        self._mins[head] = value
+        self._maxs[head] = value
+        self._sums[head] = value
+        self._counts[head] = 1
+        return closed
+
+    def _aggregate(self, index):
+        return (
+            self._starts[index],
+            self._mins[index],
+            self._maxs[index],
+            self._sums[index] / self._counts[index],
+        )
+
+    def buckets(self, since=0):
+        """Yield (start, min, max, mean) from the oldest to the newest bucket."""
+        first = (self._head - self._size + 1) % self._capacity
+        for offset in range(self._size):
+            index = (first + offset) % self._capacity
+            if self._starts[index] >= since:
+                yield self._aggregate(index)
+
+class DeviceHistory:
+    """Memory-bounded history of the measurements of one thermostat.
+
+    Raw samples are kept for the last hour or so, per-minute aggregates for a
+    day and hourly aggregates for a week.
+    """
+
+    def __init__(self):
+        self._raw = {field: SampleRing(HISTORY_RAW_SAMPLES) for field in HISTORY_FIELDS}
+        self._minutes = {field: AggregateRing(60, HISTORY_MINUTE_BUCKETS) for field in HISTORY_FIELDS}
+        self._hours = {field: AggregateRing(3600, HISTORY_HOUR_BUCKETS) for field in HISTORY_FIELDS}
+
+    def add(self, timestamp, data):
+        """Add the measurements of a snapshot and return the hourly aggregates that were completed."""
+        completed = {}
+        for field in HISTORY_FIELDS:
+            value = getattr(data, field)
+            if value is None:
+                continue
+            self._raw[field].add(timestamp, value)
+            self._minutes[field].add(timestamp, value)
+            closed = self._hours[field].add(timestamp, value)
+            if closed is not None:
+                completed[field] = closed
+        return completed
+
+    def as_dict(self, resolution=RESOLUTION_MINUTE, fields=HISTORY_FIELDS, since=0):
+        """Return the history of some fields at a resolution, ready to be serialized."""
+        result = {}
+        for field in fields:
+            if resolution == RESOLUTION_RAW:
+                result[field] = [
+                    {"time": _isoformat(timestamp), "value": round(value, 2)}
+                    for timestamp, value in self._raw[field].samples(since)
+                ]
+                continue
+
+            rings = self._minutes if resolution == RESOLUTION_MINUTE else self._hours
+            result[field] = [
+                {"start": _isoformat(start), "min": round(minimum, 2), "max": round(maximum, 2), "mean": round(mean, 2)}
+                for start, minimum, maximum, mean in rings[field].buckets(since)
+            ]
+        return result
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+def statistic_id(username, field):
+    """Return the id of the long-term statistic of a field."""
+    return f"{DOMAIN}:{slugify(username)}_{field}"
+
+@callback
+def async_import_statistics(hass: HomeAssistant, username: str, room: str, completed) -> None:
+    """Store completed hourly aggregates as long-term statistics."""
+    if not completed or "recorder" not in hass.config.components:
+        return
+
+    # Imported here, the recorder is optional for this integration
+    from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+    for field, (start, minimum, maximum, mean) in completed.items():
+        metadata = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": f"Airobot {room} {field.replace('_', ' ')}",
+            "source": DOMAIN,
+            "statistic_id": statistic_id(username, field),
+            "unit_of_measurement": _UNITS[field],
+        }
+        statistics = [{
+            "start": datetime.fromtimestamp(start, timezone.utc),
+            "min": round(minimum, 2),
+            "max": round(maximum, 2),
+            "mean": round(mean, 2),
+        }]
+        _LOGGER.debug("Importing statistics for %s: %s", metadata["statistic_id"], statistics)
+        async_add_external_statistics(hass, metadata, statistics)
@@ -0,0 +1,34 @@
+from homeassistant.core import HomeAssistant, callback
+from .const import DATA_HUB, HUB_MAX_CONCURRENT_POLLS, HUB_TICK_INTERVAL
+from .scheduler import AirobotScheduler, async_get_scheduler, async_release_scheduler
+
+class AirobotHub(AirobotScheduler):
+    """Poll every thermostat that joined the hub in scheduled batches.
+
+    Coordinators that join the hub have no timer of their own. On each tick the hub
+    refreshes the ones whose poll interval has passed, with bounded concurrency, and
+    each coordinator notifies its own entities as usual.
+    """
+
+    def __init__(self, hass, interval=HUB_TICK_INTERVAL, max_concurrent=HUB_MAX_CONCURRENT_POLLS):
+        super().__init__(hass, interval, max_concurrent)
+        # Polls due before the next tick are made now, so they don't slip by a whole tick
+        self._tolerance = interval.total_seconds() / 2
+
+    def _is_due(self, coordinator):
+        # Thermostats that are backing off after repeated failures are left out
+        return not coordinator.breaker.is_open and coordinator.poll_due(self._tolerance)
+
+    async def _async_run(self, coordinator):
+        # Errors are handled by the coordinator, which marks its entities unavailable
+        await coordinator.async_refresh()
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> AirobotHub:
+    """Return the shared hub, creating it on first use."""
+    return async_get_scheduler(hass, DATA_HUB, AirobotHub)
+
+@callback
+def async_release_hub(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove a config entry from the hub and forget the hub once it is empty."""
+    async_release_scheduler(hass, DATA_HUB, entry_id)
@@ -0,0 +1,88 @@
+from collections import Counter, deque
+from homeassistant.util import dt as dt_util
+from .const import METRICS_LATENCY_BUCKETS, METRICS_WINDOW
+
+# Kinds of failed requests
+FAILURE_TIMEOUT = "timeout"
+FAILURE_NETWORK = "network"
+FAILURE_AUTH = "auth"
+FAILURE_HTTP_STATUS = "http_status"
+FAILURE_JSON = "json"
+
+class PollMetrics:
+    """Rolling request and poll statistics for one thermostat."""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._window = window
+        # Latency samples in seconds per endpoint, the last `window` requests only
+        self._latencies = {}
+        self.requests = Counter()
+        self.failures = Counter()
+        self.endpoint_failures = Counter()
+        self.bytes_received = 0
+        self.last_success = None
+        self.last_poll_duration = None
+        self.last_parse_time = None
+
+    def record_request(self, endpoint, latency, size):
+        """Record a request that got an answer from the device."""
+        samples = self._latencies.get(endpoint)
+        if samples is None:
+            samples = self._latencies[endpoint] = deque(maxlen=self._window)
+        samples.append(latency)
+        self.requests[endpoint] += 1
+        self.bytes_received += size
+
+    def record_failure(self, endpoint, kind):
+        """Record a failed request."""
+        self.failures[kind] += 1
+        self.endpoint_failures[endpoint] += 1
+
+    def record_success(self, parse_time):
+        """Record a successful poll."""
+        self.last_success = dt_util.utcnow()
+        self.last_parse_time = parse_time
+
+    @property
+    def failure_count(self):
+        return sum(self.failures.values())
+
+    def latency_summary(self, endpoint):
+        """Return percentiles and a histogram of the recent latencies of an endpoint."""
+        samples = sorted(self._latencies.get(endpoint, ()))
+        if not samples:
+            return None
+
+        histogram = {}
+        remaining = iter(samples)
+        sample = next(remaining, None)
+        for bucket in METRICS_LATENCY_BUCKETS:
+            count = 0
+            while sample is not None and sample <= bucket:
+                count += 1
+                sample = next(remaining, None)
+            histogram[f"<={bucket}s"] = count
+        histogram[f">{METRICS_LATENCY_BUCKETS[-1]}s"] = len(samples) - sum(histogram.values())
+
+        def percentile(percent):
+            return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+        return {
+            "samples": len(samples),
+            "p50_ms": round(percentile(50) * 1000, 1),
+            "p95_ms": round(percentile(95) * 1000, 1),
+            "max_ms": round(samples[-1] * 1000, 1),
+            "histogram": histogram,
+        }
+
+    def as_dict(self):
+        return {
+            "latency": {endpoint: self.latency_summary(endpoint) for endpoint in self._latencies},
+            "requests": dict(self.requests),
+            "failures": dict(self.failures),
+            "endpoint_failures": dict(self.endpoint_failures),
+            "bytes_received": self.bytes_received,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "last_poll_duration_ms": None if self.last_poll_duration is None else round(self.last_poll_duration * 1000, 1),
+            "last_parse_time_ms": None if self.last_parse_time is None else round(self.last_parse_time * 1000, 3),
+        }
@@ -0,0 +1,140 @@
+from typing import Any, Callable, NamedTuple, Optional, Tuple, Union
+from homeassistant.components.climate.const import PRESET_AWAY, PRESET_HOME
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import CONCENTRATION_PARTS_PER_MILLION, PERCENTAGE, UnitOfTemperature
+
+# Which payload a field is read from
+STATUS = "status"
+SETTINGS = "settings"
+
+# Values of the MODE setting
+MODE_HOME = 1
+MODE_AWAY = 2
+
+PRESET_MODES = {PRESET_HOME: MODE_HOME, PRESET_AWAY: MODE_AWAY}
+
+# The device reports 65535 when it has no CO2 sensor
+CO2_NOT_AVAILABLE = 65535
+
+class AirobotSensorSpec(NamedTuple):
+    """Sensor entity created for a field."""
+
+    name: str
+    unique_id: str
+    device_class: Optional[str] = None
+    state_class: Optional[str] = SensorStateClass.MEASUREMENT
+    # Only create the sensor when the device reports a valid value
+    optional: bool = False
+
+class AirobotField(NamedTuple):
+    """Mapping of a device payload field to a snapshot attribute."""
+
+    key: str
+    source: str
+    path: Union[str, Tuple[Union[str, int], ...]]
+    default: Any = 0
+    scale: float = 1
+    # Scaled values failing this check are stored as None
+    valid: Optional[Callable[[Any], bool]] = None
+    unit: Optional[str] = None
+    sensor: Optional[AirobotSensorSpec] = None
+
+FIELDS = (
+    AirobotField(
+        "temperature", STATUS, "TEMP_AIR", scale=0.1, valid=lambda value: value <= 100,
+        unit=UnitOfTemperature.CELSIUS,
+        sensor=AirobotSensorSpec("Temp", "temp", SensorDeviceClass.TEMPERATURE),
+    ),
+    AirobotField(
+        "floor_temperature", STATUS, "TEMP_FLOOR", scale=0.1, valid=lambda value: 0 < value < 100,
+        unit=UnitOfTemperature.CELSIUS,
+        sensor=AirobotSensorSpec("Floor Temperature", "floor_temp", SensorDeviceClass.TEMPERATURE, optional=True),
+    ),
+    AirobotField(
+        "humidity", STATUS, "HUM_AIR", scale=0.1, valid=lambda value: value <= 100,
+        unit=PERCENTAGE,
+        sensor=AirobotSensorSpec("Humidity", "humidity", SensorDeviceClass.HUMIDITY),
+    ),
+    AirobotField(
+        "co2", STATUS, "CO2", default=CO2_NOT_AVAILABLE, valid=lambda value: value != CO2_NOT_AVAILABLE,
+        unit=CONCENTRATION_PARTS_PER_MILLION,
+        sensor=AirobotSensorSpec("CO2", "co2", SensorDeviceClass.CO2, optional=True),
+    ),
+    AirobotField("aqi", STATUS, "AQI"),
+    AirobotField("heating_on", STATUS, ("STATUS_FLAGS", 0, "HEATING_ON")),
+    AirobotField("preset_mode", SETTINGS, "MODE", default=MODE_HOME),
+    AirobotField("setpoint_home", SETTINGS, "SETPOINT_TEMP", scale=0.1, unit=UnitOfTemperature.CELSIUS),
+    AirobotField("setpoint_away", SETTINGS, "SETPOINT_TEMP_AWAY", scale=0.1, unit=UnitOfTemperature.CELSIUS),
+)
+
+# Attributes computed from other fields after parsing
+DERIVED_FIELDS = ("setpoint_temp",)
+
+FIELD_NAMES = tuple(field.key for field in FIELDS) + DERIVED_FIELDS
+
+# Fields only some thermostats have, their sensors are created once a valid value was seen
+OPTIONAL_FIELDS = tuple(field.key for field in FIELDS if field.sensor is not None and field.sensor.optional)
+
+class AirobotData:
+    """Immutable snapshot of the values parsed from one poll."""
+
+    __slots__ = FIELD_NAMES
+
+    def __init__(self, **values):
+        for name in FIELD_NAMES:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, AirobotData):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in FIELD_NAMES)
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in FIELD_NAMES)
+        return f"{type(self).__name__}({values})"
+
+    @property
+    def floor_temperature_available(self):
+        return self.floor_temperature is not None
+
+    def replace(self, **changes):
+        """Return a copy of the snapshot with some values changed."""
+        values = self.as_dict()
+        values.update(changes)
+        return AirobotData(**values)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in FIELD_NAMES}
+
+def _lookup(payload, path, default):
+    """Read a possibly nested value from a payload."""
+    if isinstance(path, str):
+        return payload.get(path, default)
+
+    value = payload
+    for part in path:
+        try:
+            value = value[part]
+        except (KeyError, IndexError, TypeError):
+            return default
+    return value
+
+def parse_payloads(status_data, settings_data):
+    """Build a snapshot from the raw status and settings payloads using the field table."""
+    payloads = {STATUS: status_data, SETTINGS: settings_data}
+    values = {}
+    for field in FIELDS:
+        value = _lookup(payloads[field.source], field.path, field.default)
+        if value is not None and field.scale != 1:
+            value = value * field.scale
+            # Keep one decimal, the device reports tenths
+            value = round(value, 1)
+        if value is not None and field.valid is not None and not field.valid(value):
+            value = None
+        values[field.key] = value
+
+    values["setpoint_temp"] = values["setpoint_away"] if values["preset_mode"] == MODE_AWAY else values["setpoint_home"]
+    return AirobotData(**values)
@@ -0,0 +1,32 @@
+from homeassistant.core import HomeAssistant, callback
+from .breaker import STATE_CLOSED
+from .const import DATA_RELAY, RELAY_INTERVAL, RELAY_MAX_CONCURRENT
+from .scheduler import AirobotScheduler, async_get_scheduler, async_release_scheduler
+
+class AirobotRelay(AirobotScheduler):
+    """Stream status changes of thermostats with streaming enabled.
+
+    The relay reads only the status of every thermostat about once a second
+    and pushes the values that changed into their coordinators. The regular
+    polls keep running for the settings, the history and the analytics.
+    """
+
+    def __init__(self, hass, interval=RELAY_INTERVAL, max_concurrent=RELAY_MAX_CONCURRENT):
+        super().__init__(hass, interval, max_concurrent)
+
+    def _is_due(self, coordinator):
+        # Thermostats that are backing off after repeated failures are left out, the poll is their only probe
+        return coordinator.breaker.state == STATE_CLOSED and coordinator.stream_due()
+
+    async def _async_run(self, coordinator):
+        await coordinator.async_stream_status()
+
+@callback
+def async_get_relay(hass: HomeAssistant) -> AirobotRelay:
+    """Return the shared relay, creating it on first use."""
+    return async_get_scheduler(hass, DATA_RELAY, AirobotRelay)
+
+@callback
+def async_release_relay(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove a config entry from the relay and forget the relay once it is empty."""
+    async_release_scheduler(hass, DATA_RELAY, entry_id)
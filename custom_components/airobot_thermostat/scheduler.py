@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+class AirobotScheduler(ABC):
+    """Run a task on many coordinators in scheduled rounds, shared by all config entries.
+
+    The timer runs while at least one coordinator is added. On each round the
+    task is started for the coordinators that are due, with bounded concurrency.
+    A coordinator whose task from an earlier round is still running is skipped,
+    so a slow thermostat doesn't hold up the others.
+    Subclasses implement `_async_run` and optionally `_is_due`.
+    """
+
+    def __init__(self, hass, interval, max_concurrent):
+        self._hass = hass
+        self._interval = interval
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._coordinators = {}
+        self._unsub_timer = None
+        # Running task per config entry
+        self._tasks = {}
+
+    @property
+    def coordinators(self):
+        return self._coordinators
+
+    @callback
+    def async_add_coordinator(self, entry_id, coordinator):
+        """Add a coordinator, starting the timer when it is the first one."""
+        self._coordinators[entry_id] = coordinator
+        if self._unsub_timer is None:
+            self._unsub_timer = async_track_time_interval(
+                self._hass, self._async_run_round, self._interval, cancel_on_shutdown=True
+            )
+
+    @callback
+    def async_remove_coordinator(self, entry_id):
+        """Remove a coordinator, stopping the timer when none are left."""
+        self._coordinators.pop(entry_id, None)
+        task = self._tasks.pop(entry_id, None)
+        if task is not None:
+            task.cancel()
+        if not self._coordinators and self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    def _is_due(self, coordinator):
+        """Return True when the task should run for a coordinator on this round."""
+        return True
+
+    @abstractmethod
+    async def _async_run(self, coordinator):
+        """Run the task for one coordinator."""
+
+    @callback
+    def _async_run_round(self, now=None):
+        """Start the task for the coordinators that are due and not still busy."""
+        for entry_id, coordinator in self._coordinators.items():
+            if entry_id in self._tasks:
+                _LOGGER.debug("%s is still running for %s, skipping it this round", type(self).__name__, entry_id)
+                continue
+            if not self._is_due(coordinator):
+                continue
+            # Background tasks are cancelled when Home Assistant stops
+            self._tasks[entry_id] = self._hass.async_create_background_task(
+                self._async_run_bounded(entry_id, coordinator), f"{DOMAIN} {type(self).__name__} {entry_id}"
+            )
+
+    async def _async_run_bounded(self, entry_id, coordinator):
+        try:
+            async with self._semaphore:
+                await self._async_run(coordinator)
+        finally:
+            if self._tasks.get(entry_id) is asyncio.current_task():
+                del self._tasks[entry_id]
+
+@callback
+def async_get_scheduler(hass: HomeAssistant, key: str, factory):
+    """Return the shared scheduler stored under `key`, creating it on first use."""
+    scheduler = hass.data.get(key)
+    if scheduler is None:
+        scheduler = hass.data[key] = factory(hass)
+    return scheduler
+
+@callback
+def async_release_scheduler(hass: HomeAssistant, key: str, entry_id: str) -> None:
+    """Remove a config entry from a shared scheduler and forget the scheduler once it is empty."""
+    scheduler = hass.data.get(key)
+    if scheduler is None:
+        return
+
+    scheduler.async_remove_coordinator(entry_id)
+    if not scheduler.coordinators:
+        hass.data.pop(key)
@@ -1,122 +1,203 @@
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.const import UnitOfTemperature
-from .const import DOMAIN
+from operator import attrgetter
+from typing import Any, Callable, NamedTuple, Optional
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfEnergy, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from .const import DOMAIN, SIGNAL_NEW_CAPABILITIES
+from .entity import AirobotEntity
+from .models import FIELDS
+
+class AirobotDiagnosticSpec(NamedTuple):
+    """Sensor reporting a poll metric or a heating analytic."""
+
+    key: str
+    name: str
+    value: Callable[[Any], Any]
+    unit: Optional[str] = None
+    device_class: Optional[str] = None
+    state_class: Optional[str] = None
+    # Analytics that change on almost every poll are disabled by default, to keep the recorder quiet
+    enabled: bool = True
+
+DIAGNOSTIC_SENSORS = (
+    AirobotDiagnosticSpec(
+        "poll_duration", "Poll Duration",
+        lambda metrics: None if metrics.last_poll_duration is None else round(metrics.last_poll_duration * 1000),
+        UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION, SensorStateClass.MEASUREMENT,
+    ),
+    AirobotDiagnosticSpec(
+        "poll_failures", "Poll Failures",
+        lambda metrics: metrics.failure_count,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    AirobotDiagnosticSpec(
+        "last_successful_poll", "Last Successful Poll",
+        lambda metrics: metrics.last_success,
+        device_class=SensorDeviceClass.TIMESTAMP,
+    ),
+)
+
+ANALYTICS_SENSORS = (
+    AirobotDiagnosticSpec(
+        "heating_runtime", "Heating Runtime",
+        lambda analytics: round(analytics.runtime, 1),
+        UnitOfTime.HOURS, SensorDeviceClass.DURATION, SensorStateClass.TOTAL_INCREASING,
+    ),
+    AirobotDiagnosticSpec(
+        "warmup_rate", "Warm-up Rate",
+        lambda analytics: analytics.warmup_rate,
+        "°C/min", state_class=SensorStateClass.MEASUREMENT, enabled=False,
+    ),
+)
+
+ENERGY_SENSOR = AirobotDiagnosticSpec(
+    "heating_energy", "Heating Energy",
+    lambda analytics: round(analytics.energy, 1),
+    UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING,
+)
+
+def _duty_cycle_sensor(window):
+    hours = window.seconds // 3600
+    return AirobotDiagnosticSpec(
+        f"duty_cycle_{hours}h", f"Heating Duty Cycle {hours}h",
+        lambda analytics: window.duty_cycle,
+        PERCENTAGE, state_class=SensorStateClass.MEASUREMENT, enabled=False,
+    )
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up sensor entities from a config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
 
-    entities = [
-        AirobotTemperatureSensor(coordinator),
-        AirobotHumiditySensor(coordinator),
-        AirobotHeatingStatusSensor(coordinator)
-    ]
-
-    if coordinator.data.get("co2") is not None:
-        entities.append(AirobotCO2Sensor(coordinator))
-
-    if coordinator.data.get("floor_temperature_available"):
-        entities.append(AirobotFloorTemperatureSensor(coordinator))
-
-    async_add_entities(entities, update_before_add=True)
-
-class AirobotTemperatureSensor(CoordinatorEntity, SensorEntity):
-    """Representation of the temperature sensor."""
-
-    def __init__(self, coordinator):
+    entities = [AirobotHeatingStatusSensor(coordinator)]
+
+    # Every field in the table with a sensor spec gets a sensor entity
+    for field in FIELDS:
+        if field.sensor is None:
+            continue
+        if field.sensor.optional and field.key not in coordinator.capabilities:
+            continue
+        entities.append(AirobotSensor(coordinator, field))
+
+    entities.extend(AirobotDiagnosticSensor(coordinator, spec) for spec in DIAGNOSTIC_SENSORS)
+
+    # Heating analytics, the energy estimate needs the heater power from the options
+    analytics_sensors = list(ANALYTICS_SENSORS)
+    analytics_sensors.extend(_duty_cycle_sensor(window) for window in coordinator.analytics.windows)
+    if coordinator.heater_power:
+        analytics_sensors.append(ENERGY_SENSOR)
+    entities.extend(AirobotAnalyticsSensor(coordinator, spec) for spec in analytics_sensors)
+
+    async_add_entities(entities)
+
+    @callback
+    def async_add_capability_sensors(capabilities):
+        """Add the sensors of capabilities the thermostat reported after setup."""
+        async_add_entities(
+            AirobotSensor(coordinator, field)
+            for field in FIELDS
+            if field.sensor is not None and field.key in capabilities
+        )
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_NEW_CAPABILITIES.format(config_entry.entry_id), async_add_capability_sensors
+        )
+    )
+
+class AirobotSensor(AirobotEntity, SensorEntity):
+    """Representation of a measurement reported by the thermostat."""
+
+    def __init__(self, coordinator, field):
         super().__init__(coordinator)
-        self._attr_name = f"Airobot {coordinator._room} Temp"
-        self._attr_unique_id = f"{DOMAIN}_{coordinator._username}_{coordinator._room}_temp"
-        self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-        self._attr_device_class = "temperature"
-        self._attr_state_class = "measurement"
-
-    @property
-    def device_info(self):
-        return self.coordinator.device_info
-
-    @property
-    def state(self):
-        return self.coordinator.data["temperature"]
+        spec = field.sensor
+        self._fields = (field.key,)
+        self._value = attrgetter(field.key)
+        self._attr_name = coordinator.context.entity_name(spec.name)
+        self._attr_unique_id = coordinator.context.unique_id(spec.unique_id)
+        self._attr_native_unit_of_measurement = field.unit
+        self._attr_device_class = spec.device_class
+        self._attr_state_class = spec.state_class
+
+    def _update_from_data(self, data):
+        self._attr_native_value = self._value(data)
+
+class AirobotHeatingStatusSensor(AirobotEntity, SensorEntity):
+    """Representation of the heating status sensor."""
 
-class AirobotHumiditySensor(CoordinatorEntity, SensorEntity):
-    """Representation of the humidity sensor."""
+    _fields = ("heating_on",)
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_name = f"Airobot {coordinator._room} Humidity"
-        self._attr_unique_id = f"{DOMAIN}_{coordinator._username}_{coordinator._room}_humidity"
-        self._attr_native_unit_of_measurement = "%"
-        self._attr_device_class = "humidity"
-        self._attr_state_class = "measurement"
+        self._attr_name = coordinator.context.entity_name("Heating Status")
+        self._attr_unique_id = coordinator.context.unique_id("heating_status")
 
-    @property
-    def device_info(self):
-        return self.coordinator.device_info
+    def _update_from_data(self, data):
+        """Derive the state and an icon from the heating status."""
+        self._attr_native_value = "On" if data.heating_on else "Off"
+        self._attr_icon = "mdi:radiator" if data.heating_on else "mdi:radiator-off"
 
-    @property
-    def state(self):
-        return self.coordinator.data["humidity"]
+class AirobotDiagnosticSensor(AirobotEntity, SensorEntity):
+    """Representation of a poll metric, disabled by default."""
 
-class AirobotCO2Sensor(CoordinatorEntity, SensorEntity):
-    """Representation of the CO2 sensor."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
 
-    def __init__(self, coordinator):
+    def __init__(self, coordinator, spec):
         super().__init__(coordinator)
-        self._attr_name = f"Airobot {coordinator._room} CO2"
-        self._attr_unique_id = f"{DOMAIN}_{coordinator._username}_{coordinator._room}_co2"
-        self._attr_native_unit_of_measurement = "ppm"
-        self._attr_device_class = "carbon_dioxide"
-        self._attr_state_class = "measurement"
+        self._spec = spec
+        self._last_value = None
+        self._attr_name = coordinator.context.entity_name(spec.name)
+        self._attr_unique_id = coordinator.context.unique_id(spec.key)
+        self._attr_native_unit_of_measurement = spec.unit
+        self._attr_device_class = spec.device_class
+        self._attr_state_class = spec.state_class
 
     @property
-    def device_info(self):
-        return self.coordinator.device_info
+    def available(self):
+        """Stay available while polls fail, that is when the metrics matter most."""
+        return True
 
     @property
-    def state(self):
-        return self.coordinator.data["co2"]
-
-class AirobotHeatingStatusSensor(CoordinatorEntity, SensorEntity):
-    """Representation of the heating status sensor."""
-
-    def __init__(self, coordinator):
-        super().__init__(coordinator)
-        self._attr_name = f"Airobot {coordinator._room} Heating Status"
-        self._attr_unique_id = f"{DOMAIN}_{coordinator._username}_{coordinator._room}_heating_status"
+    def native_value(self):
+        return self._spec.value(self.coordinator.metrics)
 
-    @property
-    def device_info(self):
-        return self.coordinator.device_info
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state only when the metric changed."""
+        value = self.native_value
+        if value == self._last_value:
+            return
 
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        heating_on = self.coordinator.data.get("heating_on")
-        return "On" if heating_on else "Off"
+        self._last_value = value
+        self.async_write_ha_state()
 
-    @property
-    def icon(self):
-        """Return an icon based on the heating status."""
-        return "mdi:radiator" if self.state == "On" else "mdi:radiator-off"
-        
-class AirobotFloorTemperatureSensor(CoordinatorEntity, SensorEntity):
-    """Representation of the floor temperature sensor."""
+class AirobotAnalyticsSensor(AirobotEntity, SensorEntity):
+    """Representation of a heating analytic computed by the coordinator."""
 
-    def __init__(self, coordinator):
+    def __init__(self, coordinator, spec):
         super().__init__(coordinator)
-        self._attr_name = f"Airobot {coordinator._room} Floor Temperature"
-        self._attr_unique_id = f"{DOMAIN}_{coordinator._username}_{coordinator._room}_floor_temp"
-        self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-        self._attr_device_class = "temperature"
-        self._attr_state_class = "measurement"
-
-    @property
-    def device_info(self):
-        return self.coordinator.device_info
+        self._spec = spec
+        self._last_value = None
+        self._attr_name = coordinator.context.entity_name(spec.name)
+        self._attr_unique_id = coordinator.context.unique_id(spec.key)
+        self._attr_native_unit_of_measurement = spec.unit
+        self._attr_device_class = spec.device_class
+        self._attr_state_class = spec.state_class
+        self._attr_entity_registry_enabled_default = spec.enabled
 
     @property
-    def state(self):
-        """Return the state of the sensor."""
-        return self.coordinator.data.get("floor_temperature")
+    def native_value(self):
+        return self._spec.value(self.coordinator.analytics)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state only when availability or the value changed."""
+        available = self.available
+        value = self.native_value
+        if available == self._last_available and value == self._last_value:
+            return
+
+        self._last_available = available
+        self._last_value = value
+        self.async_write_ha_state()
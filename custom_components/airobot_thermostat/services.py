@@ -0,0 +1,112 @@
+import voluptuous as vol
+from homeassistant.components.climate.const import ATTR_PRESET_MODE
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE, ENTITY_MATCH_ALL
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+from homeassistant.util import dt as dt_util
+from .bulk import async_bulk_write
+from .const import DOMAIN
+from .history import HISTORY_FIELDS, RESOLUTION_MINUTE, RESOLUTIONS
+from .models import PRESET_MODES
+
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_BULK_SET = "bulk_set"
+
+ATTR_RESOLUTION = "resolution"
+ATTR_FIELDS = "fields"
+ATTR_SINCE = "since"
+
+GET_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+    vol.Optional(ATTR_RESOLUTION, default=RESOLUTION_MINUTE): vol.In(RESOLUTIONS),
+    vol.Optional(ATTR_FIELDS, default=list(HISTORY_FIELDS)): vol.All(cv.ensure_list, [vol.In(HISTORY_FIELDS)]),
+    vol.Optional(ATTR_SINCE): cv.datetime,
+})
+
+BULK_SET_SCHEMA = vol.All(
+    cv.make_entity_service_schema({
+        vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+        vol.Optional(ATTR_PRESET_MODE): vol.In(PRESET_MODES),
+    }),
+    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_PRESET_MODE),
+)
+
+@callback
+def _async_get_coordinator(hass: HomeAssistant, entity_id: str):
+    """Return the coordinator of the thermostat an entity belongs to."""
+    entry = er.async_get(hass).async_get(entity_id)
+    if entry is None or entry.platform != DOMAIN:
+        raise HomeAssistantError(f"{entity_id} is not an Airobot thermostat entity")
+
+    data = hass.data.get(DOMAIN, {}).get(entry.config_entry_id)
+    if data is None:
+        raise HomeAssistantError(f"The thermostat of {entity_id} is not loaded")
+    return data["coordinator"]
+
+@callback
+def _async_get_target_coordinators(hass: HomeAssistant, call: ServiceCall):
+    """Return the coordinators of the thermostats targeted by a service call, each once."""
+    loaded = hass.data.get(DOMAIN, {})
+    if call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL:
+        return [data["coordinator"] for data in loaded.values()]
+
+    # Areas and devices are expanded to their entities
+    selected = async_extract_referenced_entity_ids(hass, call)
+    registry = er.async_get(hass)
+    coordinators = {}
+    for entity_id in sorted(selected.referenced | selected.indirectly_referenced):
+        entry = registry.async_get(entity_id)
+        if entry is None or entry.platform != DOMAIN or entry.config_entry_id not in loaded:
+            continue
+        coordinators.setdefault(entry.config_entry_id, loaded[entry.config_entry_id]["coordinator"])
+    return list(coordinators.values())
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_get_history(call: ServiceCall):
+        coordinator = _async_get_coordinator(hass, call.data[ATTR_ENTITY_ID])
+        since = call.data.get(ATTR_SINCE)
+        return coordinator.history.as_dict(
+            call.data[ATTR_RESOLUTION],
+            call.data[ATTR_FIELDS],
+            dt_util.as_utc(since).timestamp() if since else 0,
+        )
+
+    async def async_bulk_set(call: ServiceCall):
+        coordinators = _async_get_target_coordinators(hass, call)
+        if not coordinators:
+            raise HomeAssistantError("No loaded Airobot thermostats match the target")
+
+        preset_mode = call.data.get(ATTR_PRESET_MODE)
+        results = await async_bulk_write(
+            coordinators,
+            call.data.get(ATTR_TEMPERATURE),
+            PRESET_MODES[preset_mode] if preset_mode else None,
+        )
+
+        failed = [result for result in results if not result["success"]]
+        if failed and not call.return_response:
+            raise HomeAssistantError(
+                "Failed to update " + ", ".join(f"{result['room']} ({result['error']})" for result in failed)
+            )
+        return {"thermostats": results}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        async_bulk_set,
+        schema=BULK_SET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,53 @@
+import logging
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .models import AirobotData
+
+_LOGGER = logging.getLogger(__name__)
+
+class AirobotStore:
+    """Cache of the last known snapshot of a thermostat in Home Assistant storage.
+
+    The cache lets the entities be created and show their last values at
+    startup, before the thermostat has answered. It also keeps the heating
+    analytics across restarts.
+    """
+
+    def __init__(self, hass, entry_id):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._coordinator = None
+        self._save_pending = False
+
+    async def async_load(self):
+        """Return the cached snapshot and analytics state, each None when not cached."""
+        cached = await self._store.async_load()
+        if not cached:
+            return None, None
+
+        _LOGGER.debug("Loaded cached state: %s", cached)
+        data = AirobotData(**cached["data"]) if cached.get("data") else None
+        return data, cached.get("analytics")
+
+    @callback
+    def async_schedule_save(self, coordinator):
+        """Save the state of a coordinator after a delay, at most once per delay."""
+        self._coordinator = coordinator
+        if self._save_pending:
+            return
+
+        # Store.async_delay_save restarts its timer on every call, so only the first change schedules a save
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self):
+        self._save_pending = False
+        coordinator = self._coordinator
+        return {
+            "data": coordinator.data.as_dict() if coordinator.data else None,
+            "analytics": coordinator.analytics.as_dict(),
+        }
+
+    async def async_remove(self):
+        await self._store.async_remove()